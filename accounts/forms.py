@@ -1,8 +1,23 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
-from .models import CustomUser
+from .models import CustomUser, normalize_blood_group
+
+
+class BloodGroupField(forms.ChoiceField):
+    """Choice of blood group that also accepts spellings like 'a +'."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('choices', [('', 'Select blood group'), *CustomUser.BLOOD_GROUP_CHOICES])
+        kwargs.setdefault('required', False)
+        super().__init__(**kwargs)
+
+    def to_python(self, value):
+        return normalize_blood_group(super().to_python(value))
+
 
 class CustomUserCreationForm(UserCreationForm):
+    blood_group = BloodGroupField()
+
     class Meta:
         model = CustomUser
         fields = ('username', 'email', 'user_type', 'phone_number', 
@@ -15,8 +30,10 @@ class CustomUserCreationForm(UserCreationForm):
             self.fields[field].required = False
 
 class CustomUserChangeForm(UserChangeForm):
+    blood_group = BloodGroupField()
+
     class Meta:
         model = CustomUser
         fields = ('username', 'email', 'first_name', 'last_name', 
                   'user_type', 'phone_number', 'blood_group', 
-                  'date_of_birth', 'address', 'city', 'profile_picture')
\ No newline at end of file
+                  'date_of_birth', 'address', 'city', 'profile_picture')
@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_directory_search_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='customuser',
+            name='user_type_idx',
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['user_type', 'blood_group'], name='user_type_blood_group_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-18 10:00
+
+from django.db import migrations, models
+from django.db.models import F, Value
+from django.db.models.functions import Replace, Upper
+
+
+BLOOD_GROUPS = ['A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-']
+
+
+def normalize_blood_groups(apps, schema_editor):
+    # Profiles saved before the choices existed may read 'a+' or 'A +';
+    # anything still unrecognised afterwards is left for its owner to fix
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    (CustomUser.objects.exclude(blood_group__in=BLOOD_GROUPS + [''])
+     .update(blood_group=Upper(Replace(F('blood_group'), Value(' '), Value('')))))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_phone_number_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_blood_groups, reverse_code=migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='customuser',
+            name='blood_group',
+            field=models.CharField(blank=True, choices=[('A+', 'A+'), ('A-', 'A-'), ('B+', 'B+'), ('B-', 'B-'), ('AB+', 'AB+'), ('AB-', 'AB-'), ('O+', 'O+'), ('O-', 'O-')], max_length=5),
+        ),
+    ]
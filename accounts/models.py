@@ -1,5 +1,12 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
+
+
+def normalize_blood_group(value):
+    """'a +' -> 'A+', the form blood groups are stored and matched in."""
+    return (value or '').replace(' ', '').upper()
+
 
 class CustomUser(AbstractUser):
     USER_TYPE_CHOICES = (
@@ -8,15 +15,35 @@ class CustomUser(AbstractUser):
         ('doctor', 'Doctor'),
         ('admin', 'Administrator'),
     )
+    BLOOD_GROUP_CHOICES = [(group, group) for group in ('A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-')]
     
     user_type = models.CharField(max_length=20, choices=USER_TYPE_CHOICES, default='donor')
     phone_number = models.CharField(max_length=15, blank=True)
-    blood_group = models.CharField(max_length=5, blank=True)
+    blood_group = models.CharField(max_length=5, choices=BLOOD_GROUP_CHOICES, blank=True)
     date_of_birth = models.DateField(null=True, blank=True)
     address = models.TextField(blank=True)
     city = models.CharField(max_length=100, blank=True)
     is_verified = models.BooleanField(default=False)
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Serves user_type filters alone and donor matching by blood group
+            models.Index(fields=['user_type', 'blood_group'], name='user_type_blood_group_idx'),
+            # Donation imports resolve donors by phone number
+            models.Index(fields=['phone_number'], name='user_phone_idx'),
+            # Case-insensitive prefix search for the chat user directory
+            models.Index(Lower('username'), name='user_username_lower_idx'),
+            models.Index(Lower('first_name'), name='user_first_name_lower_idx'),
+            models.Index(Lower('last_name'), name='user_last_name_lower_idx'),
+            models.Index(Lower('city'), name='user_city_lower_idx'),
+            models.Index(Lower('blood_group'), name='user_blood_group_lower_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.username} ({self.get_user_type_display()})"
\ No newline at end of file
+        return f"{self.username} ({self.get_user_type_display()})"
+
+    def save(self, *args, **kwargs):
+        # Donor matching compares groups exactly (bloodapp.matching)
+        self.blood_group = normalize_blood_group(self.blood_group)
+        super().save(*args, **kwargs)
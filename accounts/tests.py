@@ -1,3 +1,32 @@
 from django.test import TestCase
 
-# Create your tests here.
+from crimsonbalance.testing import PASSWORD, QueryBudgetMixin, seed_volume
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Upper bounds on the queries each accounts URL runs (see bloodapp.tests)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_volume()
+        cls.donor = cls.data['donor']
+
+    def test_anonymous_pages(self):
+        for url in ('/accounts/register/', '/accounts/login/'):
+            with self.assertMaxQueries(0):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_login(self):
+        with self.assertMaxQueries(9):
+            response = self.client.post('/accounts/login/', {'username': self.donor.username, 'password': PASSWORD})
+        self.assertRedirects(response, '/', fetch_redirect_response=False)
+
+    def test_logout(self):
+        self.client.force_login(self.donor)
+        with self.assertMaxQueries(6):
+            self.assertEqual(self.client.post('/accounts/logout/').status_code, 302)
+
+    def test_profile(self):
+        self.client.force_login(self.donor)
+        with self.assertMaxQueries(2):
+            self.assertEqual(self.client.get('/accounts/profile/').status_code, 200)
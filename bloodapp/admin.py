@@ -1,12 +1,53 @@
-from django.contrib import admin
+import io
+
+from django.contrib import admin, messages
+from django.shortcuts import redirect, render
+from django.urls import path
 from .models import *
 from django.utils.html import format_html
+from . import importer, ledger, scheduling
+from .forms import AppointmentAdminForm, DonationImportForm, InventoryAdjustmentForm
 
 @admin.register(BloodDonation)
 class BloodDonationAdmin(admin.ModelAdmin):
     list_display = ['donor', 'donation_date', 'blood_group', 'quantity_ml', 'is_processed']
     list_filter = ['blood_group', 'is_processed', 'donation_date']
     search_fields = ['donor__username', 'donor__email']
+    change_list_template = 'admin/bloodapp/blooddonation/change_list.html'
+
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='bloodapp_blooddonation_import'),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            return redirect('admin:bloodapp_blooddonation_changelist')
+
+        form = DonationImportForm(request.POST or None, request.FILES or None)
+        result = None
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['file']
+            try:
+                fmt = importer.detect_format(upload.name)
+                stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+                result = importer.import_donations(importer.read_rows(stream, fmt),
+                                                   dry_run=form.cleaned_data['dry_run'])
+            except (UnicodeDecodeError, ValueError) as exc:
+                messages.error(request, f'Import failed: {exc}')
+            else:
+                verb = 'Validated' if form.cleaned_data['dry_run'] else 'Imported'
+                level = messages.WARNING if result.error_count else messages.SUCCESS
+                messages.add_message(request, level,
+                                     f'{verb} {result.created} donations; {result.error_count} rows rejected.')
+
+        return render(request, 'admin/bloodapp/blooddonation/import.html', {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Import donations',
+            'form': form,
+            'result': result,
+        })
 
 @admin.register(BloodRequest)
 class BloodRequestAdmin(admin.ModelAdmin):
@@ -24,11 +65,60 @@ class InformationPostAdmin(admin.ModelAdmin):
 class AppointmentAdmin(admin.ModelAdmin):
     list_display = ['user', 'appointment_type', 'scheduled_date', 'status']
     list_filter = ['status', 'appointment_type', 'scheduled_date']
+    # Saves and deletes keep the slot's booked count current (Appointment.save, bloodapp.signals)
+    form = AppointmentAdminForm
+
+    def save_model(self, request, obj, form, change):
+        # The form checked for room, but another booking may have taken the last place since
+        try:
+            super().save_model(request, obj, form, change)
+        except scheduling.SlotUnavailable as e:
+            self.message_user(request, f'{e} The appointment was not saved.', level=messages.ERROR)
+
+@admin.register(AppointmentSlot)
+class AppointmentSlotAdmin(admin.ModelAdmin):
+    list_display = ['date', 'appointment_type', 'capacity', 'booked']
+    list_filter = ['appointment_type', 'date']
+    list_editable = ['capacity']
+    # booked only moves through bloodapp.scheduling
+    readonly_fields = ['booked']
 
 @admin.register(BloodInventory)
 class BloodInventoryAdmin(admin.ModelAdmin):
     list_display = ['blood_group', 'available_units', 'critical_level', 'last_updated']
-    list_editable = ['available_units', 'critical_level']
+    # Stock changes go through InventoryTransaction so the ledger stays complete
+    list_editable = ['critical_level']
+    readonly_fields = ['available_units']
+
+@admin.register(InventoryTransaction)
+class InventoryTransactionAdmin(admin.ModelAdmin):
+    list_display = ['blood_group', 'delta', 'reason', 'created_by', 'created_at']
+    list_filter = ['reason', 'blood_group', 'created_at']
+    form = InventoryAdjustmentForm
+
+    def save_model(self, request, obj, form, change):
+        # Manual adjustments are applied through the ledger like any other movement
+        try:
+            obj.pk = ledger.record(obj.blood_group, obj.delta, 'adjustment',
+                                   user=request.user, note=obj.note).pk
+        except ledger.InsufficientStock as e:
+            # Another withdrawal got in after the form checked the stock
+            self.message_user(request, f'{e} Nothing was recorded.', level=messages.ERROR)
+
+    def log_addition(self, request, obj, message):
+        if obj.pk is not None:
+            return super().log_addition(request, obj, message)
+
+    def response_add(self, request, obj, post_url_continue=None):
+        if obj.pk is None:
+            return redirect(request.path)
+        return super().response_add(request, obj, post_url_continue)
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 
 class BloodInventoryAdmin(admin.ModelAdmin):
@@ -0,0 +1,126 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Appointment
+
+
+# Window lengths in days for ?view=; an explicit start/end may span up to MAX_AGENDA_DAYS
+AGENDA_VIEWS = {'day': 1, 'week': 7}
+MAX_AGENDA_DAYS = 31
+
+# Minutes blocked out per appointment type in the calendar feed
+APPOINTMENT_MINUTES = {'whole_blood': 60, 'platelets': 120, 'plasma': 90, 'double_red': 90}
+DEFAULT_MINUTES = 60
+
+ICAL_STATUS = {'pending': 'TENTATIVE', 'confirmed': 'CONFIRMED', 'completed': 'CONFIRMED', 'cancelled': 'CANCELLED'}
+
+
+def window(params):
+    """
+    Return the [start, end) dates asked for by ``params``: either explicit
+    ``start``/``end`` dates, or ``view`` (day/week, weeks start on Monday)
+    around ``date`` (default today).
+    """
+    view = params.get('view') or 'day'
+    if view not in AGENDA_VIEWS:
+        raise ValueError('"view" must be day or week.')
+
+    if params.get('start'):
+        start = parse_date(params['start'])
+        end = parse_date(params['end']) if params.get('end') else None
+        if start is None or (params.get('end') and end is None):
+            raise ValueError('"start" and "end" must be dates (YYYY-MM-DD).')
+        end = end or start + timedelta(days=AGENDA_VIEWS[view])
+        if end <= start:
+            raise ValueError('"end" must be after "start".')
+        return start, min(end, start + timedelta(days=MAX_AGENDA_DAYS))
+
+    day = parse_date(params['date']) if params.get('date') else timezone.localdate()
+    if day is None:
+        raise ValueError('"date" must be a date (YYYY-MM-DD).')
+    if view == 'week':
+        day -= timedelta(days=day.weekday())
+    return day, day + timedelta(days=AGENDA_VIEWS[view])
+
+
+def appointments_between(start, end):
+    """Appointments on local days [start, end), read in appt_date_id_idx order."""
+    start_at = timezone.make_aware(datetime.combine(start, time.min))
+    end_at = timezone.make_aware(datetime.combine(end, time.min))
+    return (Appointment.objects
+            .filter(scheduled_date__gte=start_at, scheduled_date__lt=end_at)
+            .select_related('user')
+            .order_by('scheduled_date', 'id'))
+
+
+def group_by_day(appointments, start, end):
+    """[{date, counts, appointments: {status: [...]}}] for every day in the window."""
+    days = {}
+    day = start
+    while day < end:
+        days[day] = {status: [] for status, _ in Appointment.STATUS_CHOICES}
+        day += timedelta(days=1)
+    for appt in appointments:
+        days[timezone.localtime(appt.scheduled_date).date()].setdefault(appt.status, []).append(appt)
+    return [
+        {
+            'date': day,
+            'counts': {status: len(appts) for status, appts in by_status.items()},
+            'appointments': by_status,
+        }
+        for day, by_status in days.items()
+    ]
+
+
+def _ical_text(value):
+    return (value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _ical_time(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _fold(line):
+    # RFC 5545: content lines are folded at 75 octets
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    parts, chunk = [], b''
+    for char in line:
+        size = len(char.encode())
+        if len(chunk) + size > (75 if not parts else 74):
+            parts.append(chunk.decode())
+            chunk = b''
+        chunk += char.encode()
+    parts.append(chunk.decode())
+    return '\r\n '.join(parts)
+
+
+def to_ical(appointments, host='crimsonbalance'):
+    """Render appointments as an iCalendar (RFC 5545) document."""
+    stamp = _ical_time(timezone.now())
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Crimson Balance//Appointments//EN',
+        'CALSCALE:GREGORIAN',
+    ]
+    for appt in appointments:
+        minutes = APPOINTMENT_MINUTES.get(appt.appointment_type, DEFAULT_MINUTES)
+        lines += [
+            'BEGIN:VEVENT',
+            f'UID:appointment-{appt.id}@{host}',
+            f'DTSTAMP:{stamp}',
+            f'DTSTART:{_ical_time(appt.scheduled_date)}',
+            f'DTEND:{_ical_time(appt.scheduled_date + timedelta(minutes=minutes))}',
+            'SUMMARY:' + _ical_text(f'{appt.appointment_type.replace("_", " ").title()} - {appt.user.username}'),
+            f'STATUS:{ICAL_STATUS.get(appt.status, "TENTATIVE")}',
+        ]
+        if appt.notes:
+            lines.append('DESCRIPTION:' + _ical_text(appt.notes))
+        lines.append('END:VEVENT')
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(_fold(line) for line in lines) + '\r\n'
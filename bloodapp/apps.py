@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class BloodappConfig(AppConfig):
     name = 'bloodapp'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,88 @@
+from django.db import transaction
+from django.utils import timezone
+
+from . import counters, ledger, scheduling, stats
+from .models import BloodDonation, BloodRequest, Appointment, InventoryTransaction
+
+
+# Bulk doctor actions. Each one locks the rows it will change, applies a
+# single UPDATE ... WHERE id IN (...) and then the side-effects the
+# per-row views get from save(): ledger entries, UserStats counters and
+# cached home page figures. update() sends no signals, hence the latter.
+
+def process_donations(ids, user=None):
+    """Mark pending donations processed and stock their units. Returns the count."""
+    with transaction.atomic():
+        donations = list(
+            BloodDonation.objects.select_for_update()
+            .filter(id__in=ids, is_processed=False)
+            .only('id', 'blood_group', 'quantity_ml')
+        )
+        if not donations:
+            return 0
+        BloodDonation.objects.filter(id__in=[d.id for d in donations]).update(
+            is_processed=True, processed_date=timezone.now())
+        ledger.record_many([
+            InventoryTransaction(
+                blood_group=d.blood_group, delta=ledger.units_for_donation(d),
+                reason='donation', donation=d, created_by=user,
+            )
+            for d in donations
+        ])
+    return len(donations)
+
+
+def fulfill_requests(ids, user=None):
+    """
+    Mark open requests fulfilled and draw their units from stock. Returns
+    the count; raises InsufficientStock (changing nothing) if stock can't
+    cover them all.
+    """
+    with transaction.atomic():
+        requests = list(
+            BloodRequest.objects.select_for_update()
+            .filter(id__in=ids, is_fulfilled=False)
+            .only('id', 'recipient_id', 'blood_group', 'units_required')
+        )
+        if not requests:
+            return 0
+        BloodRequest.objects.filter(id__in=[r.id for r in requests]).update(
+            is_fulfilled=True, fulfilled_date=timezone.now())
+        ledger.record_many([
+            InventoryTransaction(
+                blood_group=r.blood_group, delta=-r.units_required,
+                reason='request', blood_request=r, created_by=user,
+            )
+            for r in requests
+        ])
+        counters.apply_changes(BloodRequest, [
+            ({'recipient_id': r.recipient_id, 'is_fulfilled': False},
+             {'recipient_id': r.recipient_id, 'is_fulfilled': True})
+            for r in requests
+        ])
+        transaction.on_commit(lambda: stats.invalidate(stats.REQUEST_STATS_KEY))
+    return len(requests)
+
+
+def update_appointments(ids, status):
+    """
+    Move appointments to ``status``. Returns the number that changed;
+    raises SlotUnavailable (changing nothing) if reinstating them would
+    overfill a slot.
+    """
+    with transaction.atomic():
+        rows = list(
+            Appointment.objects.select_for_update()
+            .filter(id__in=ids).exclude(status=status)
+            .values('id', 'user_id', 'status', 'slot_id')
+        )
+        if not rows:
+            return 0
+        Appointment.objects.filter(id__in=[row['id'] for row in rows]).update(status=status)
+        scheduling.apply_status_changes((row['slot_id'], row['status'], status) for row in rows)
+        counters.apply_changes(Appointment, [
+            ({'user_id': row['user_id'], 'status': row['status']},
+             {'user_id': row['user_id'], 'status': status})
+            for row in rows
+        ])
+    return len(rows)
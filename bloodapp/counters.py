@@ -0,0 +1,139 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, DateTimeField, ExpressionWrapper, F, Max, OuterRef, Q, Subquery, Sum, Value
+
+from .models import BloodDonation, BloodRequest, Appointment, UserStats, DONATION_INTERVAL
+
+
+APPOINTMENT_STATUS_FIELDS = {
+    'pending': 'pending_appointments',
+    'confirmed': 'confirmed_appointments',
+    'completed': 'completed_appointments',
+    'cancelled': 'cancelled_appointments',
+}
+
+# Columns each model's rows need to know what they contribute to UserStats
+# (and, for appointments, which slot place they hold; see bloodapp.scheduling)
+TRACKED_FIELDS = {
+    BloodDonation: ('donor_id', 'donation_date', 'quantity_ml'),
+    BloodRequest: ('recipient_id', 'is_fulfilled'),
+    Appointment: ('user_id', 'status', 'slot_id'),
+}
+
+
+def contribution(model, values):
+    """Return {user_id: {counter: delta}} for one row's tracked values."""
+    if model is BloodDonation:
+        return {values['donor_id']: {'donation_count': 1, 'total_donated_ml': values['quantity_ml']}}
+    if model is BloodRequest:
+        return {values['recipient_id']: {
+            'request_count': 1,
+            'fulfilled_request_count': 1 if values['is_fulfilled'] else 0,
+        }}
+    counters = {'appointment_count': 1}
+    status_field = APPOINTMENT_STATUS_FIELDS.get(values['status'])
+    if status_field:
+        counters[status_field] = 1
+    return {values['user_id']: counters}
+
+
+def snapshot(instance):
+    return {field: getattr(instance, field) for field in TRACKED_FIELDS[type(instance)]}
+
+
+def apply_change(model, old=None, new=None):
+    """
+    Move a row's contribution from its ``old`` tracked values to ``new``
+    ones (either may be None for create/delete) using F() updates.
+    """
+    apply_changes(model, [(old, new)])
+
+
+def apply_changes(model, changes):
+    """
+    apply_change() for many (old, new) pairs. Users whose counters move by
+    the same amounts share one UPDATE, so a bulk action costs a handful of
+    queries however many users it touches.
+
+    Call it after the rows have been written: users without a UserStats
+    row yet are rebuilt from the source tables, which already include the
+    change, rather than having a delta applied to zeroed counters.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    for old, new in changes:
+        for values, sign in ((old, -1), (new, 1)):
+            if values is None:
+                continue
+            for user_id, counters in contribution(model, values).items():
+                for counter, amount in counters.items():
+                    deltas[user_id][counter] += sign * amount
+
+    groups = defaultdict(list)
+    for user_id, counters in deltas.items():
+        key = tuple(sorted((counter, amount) for counter, amount in counters.items() if amount))
+        # Donations always refresh the latest-donation dates, even with no count change
+        if key or model is BloodDonation:
+            groups[key].append(user_id)
+    if not groups:
+        return
+
+    with transaction.atomic():
+        user_ids = [user_id for ids in groups.values() for user_id in ids]
+        existing = set(UserStats.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+        missing = [user_id for user_id in user_ids if user_id not in existing]
+        if missing:
+            rebuild(missing)
+        for key, ids in groups.items():
+            ids = [user_id for user_id in ids if user_id in existing]
+            if not ids:
+                continue
+            changes = {counter: F(counter) + amount for counter, amount in key}
+            if model is BloodDonation:
+                latest = Subquery(
+                    BloodDonation.objects.filter(donor_id=OuterRef('user_id'))
+                    .order_by('-donation_date').values('donation_date')[:1]
+                )
+                changes['last_donation_date'] = latest
+                changes['next_eligible_date'] = ExpressionWrapper(
+                    latest + Value(DONATION_INTERVAL), output_field=DateTimeField())
+            UserStats.objects.filter(user_id__in=ids).update(**changes)
+
+
+def rebuild(user_ids=None):
+    """Recompute UserStats rows from the source tables."""
+    stats = defaultdict(dict)
+
+    donations = BloodDonation.objects.values('donor_id').annotate(
+        donation_count=Count('id'), total_donated_ml=Sum('quantity_ml'),
+        last_donation_date=Max('donation_date'))
+    requests = BloodRequest.objects.values('recipient_id').annotate(
+        request_count=Count('id'),
+        fulfilled_request_count=Count('id', filter=Q(is_fulfilled=True)))
+    appointments = Appointment.objects.values('user_id').annotate(
+        appointment_count=Count('id'),
+        **{field: Count('id', filter=Q(status=status))
+           for status, field in APPOINTMENT_STATUS_FIELDS.items()})
+
+    if user_ids is not None:
+        donations = donations.filter(donor_id__in=user_ids)
+        requests = requests.filter(recipient_id__in=user_ids)
+        appointments = appointments.filter(user_id__in=user_ids)
+
+    for rows, key in ((donations, 'donor_id'), (requests, 'recipient_id'), (appointments, 'user_id')):
+        for row in rows:
+            stats[row.pop(key)].update(row)
+    for values in stats.values():
+        if values.get('last_donation_date'):
+            values['next_eligible_date'] = values['last_donation_date'] + DONATION_INTERVAL
+
+    with transaction.atomic():
+        existing = UserStats.objects.all()
+        if user_ids is not None:
+            existing = existing.filter(user_id__in=user_ids)
+        existing.delete()
+        UserStats.objects.bulk_create(
+            [UserStats(user_id=user_id, **values) for user_id, values in stats.items()],
+            batch_size=500,
+        )
+    return len(stats)
@@ -0,0 +1,122 @@
+import csv
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import BloodDonation, BloodRequest, Appointment
+
+
+# Rows fetched per database round trip, and CSV rows joined per yielded chunk
+EXPORT_CHUNK_SIZE = 2000
+
+# Each export: model, the date field its from/to range applies to, the
+# (header, lookup) columns, and the extra filters it accepts.
+EXPORTS = {
+    'donations': {
+        'model': BloodDonation,
+        'date_field': 'donation_date',
+        'columns': [
+            ('id', 'id'), ('donor', 'donor__username'), ('donation_date', 'donation_date'),
+            ('blood_group', 'blood_group'), ('quantity_ml', 'quantity_ml'),
+            ('hemoglobin_level', 'hemoglobin_level'), ('blood_pressure', 'blood_pressure'),
+            ('is_processed', 'is_processed'), ('processed_date', 'processed_date'),
+        ],
+        'filters': {'blood_group': 'blood_group', 'processed': 'is_processed'},
+    },
+    'requests': {
+        'model': BloodRequest,
+        'date_field': 'required_date',
+        'columns': [
+            ('id', 'id'), ('recipient', 'recipient__username'), ('patient_name', 'patient_name'),
+            ('blood_group', 'blood_group'), ('units_required', 'units_required'),
+            ('urgency', 'urgency'), ('hospital_name', 'hospital_name'),
+            ('required_date', 'required_date'), ('is_fulfilled', 'is_fulfilled'),
+            ('fulfilled_date', 'fulfilled_date'),
+        ],
+        'filters': {'blood_group': 'blood_group', 'urgency': 'urgency', 'fulfilled': 'is_fulfilled'},
+    },
+    'appointments': {
+        'model': Appointment,
+        'date_field': 'scheduled_date',
+        'columns': [
+            ('id', 'id'), ('user', 'user__username'), ('appointment_type', 'appointment_type'),
+            ('scheduled_date', 'scheduled_date'), ('status', 'status'), ('created_at', 'created_at'),
+        ],
+        'filters': {'status': 'status', 'type': 'appointment_type'},
+    },
+}
+
+# Leading characters spreadsheets read as the start of a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+BOOLEAN_VALUES = {'1': True, 'true': True, 'yes': True, '0': False, 'false': False, 'no': False}
+
+
+def _date_bound(model, field, value, name):
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f'"{name}" must be a date (YYYY-MM-DD).')
+    if name == 'to':
+        day += timedelta(days=1)
+    if model._meta.get_field(field).get_internal_type() == 'DateTimeField':
+        return timezone.make_aware(datetime.combine(day, time.min))
+    return day
+
+
+def export_queryset(kind, params):
+    """
+    values_list() queryset for ``kind`` narrowed by ``params``: inclusive
+    ``from``/``to`` dates plus the export's own filters. Ordered by the
+    date field and id so the date/id index is read in order.
+    """
+    spec = EXPORTS[kind]
+    model, date_field = spec['model'], spec['date_field']
+    queryset = model.objects.all()
+
+    if params.get('from'):
+        queryset = queryset.filter(**{f'{date_field}__gte': _date_bound(model, date_field, params['from'], 'from')})
+    if params.get('to'):
+        queryset = queryset.filter(**{f'{date_field}__lt': _date_bound(model, date_field, params['to'], 'to')})
+    for name, field in spec['filters'].items():
+        value = params.get(name)
+        if not value:
+            continue
+        if model._meta.get_field(field).get_internal_type() == 'BooleanField':
+            if value.lower() not in BOOLEAN_VALUES:
+                raise ValueError(f'"{name}" must be yes or no.')
+            value = BOOLEAN_VALUES[value.lower()]
+        queryset = queryset.filter(**{field: value})
+
+    lookups = [lookup for _, lookup in spec['columns']]
+    return queryset.order_by(date_field, 'id').values_list(*lookups)
+
+
+def _cell(value):
+    # Text like "=HYPERLINK(...)" in a patient name would run when the file is opened
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class _Echo:
+    """File-like object whose write() hands the CSV line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(kind, queryset):
+    """
+    Yield the export as CSV text, EXPORT_CHUNK_SIZE rows at a time. Text
+    cells that would start a spreadsheet formula get a leading quote.
+    """
+    writer = csv.writer(_Echo())
+    lines = [writer.writerow([header for header, _ in EXPORTS[kind]['columns']])]
+    for row in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        lines.append(writer.writerow([_cell(value) for value in row]))
+        if len(lines) >= EXPORT_CHUNK_SIZE:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
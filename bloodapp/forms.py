@@ -1,5 +1,6 @@
 from django import forms
-from .models import InformationPost
+from django.utils import timezone
+from .models import Appointment, BloodInventory, InformationPost, InventoryTransaction
 
 class InformationPostForm(forms.ModelForm):
     class Meta:
@@ -12,4 +13,48 @@ class InformationPostForm(forms.ModelForm):
             'image': forms.ClearableFileInput(attrs={'class': 'form-control'}),
             'is_published': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
             'is_featured': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
-        }
\ No newline at end of file
+        }
+
+
+class DonationImportForm(forms.Form):
+    file = forms.FileField(help_text='CSV, JSON array or JSON Lines export of a donation drive.')
+    dry_run = forms.BooleanField(required=False, help_text='Only validate the rows.')
+
+
+class AppointmentAdminForm(forms.ModelForm):
+    class Meta:
+        model = Appointment
+        fields = '__all__'
+
+    def clean(self):
+        cleaned_data = super().clean()
+        slot, status = cleaned_data.get('slot'), cleaned_data.get('status')
+        if slot is None:
+            return cleaned_data
+        scheduled_date = cleaned_data.get('scheduled_date')
+        if scheduled_date and timezone.localtime(scheduled_date).date() != slot.date:
+            raise forms.ValidationError({'slot': 'This slot is for a different day than the appointment.'})
+        if cleaned_data.get('appointment_type') and cleaned_data['appointment_type'] != slot.appointment_type:
+            raise forms.ValidationError({'slot': 'This slot is for a different appointment type.'})
+        if status == 'cancelled':
+            return cleaned_data
+        # self.instance still holds the saved values here
+        held = self.instance.pk and self.instance.slot_id == slot.pk and self.instance.status != 'cancelled'
+        if not held and slot.available <= 0:
+            raise forms.ValidationError({'slot': 'This slot is full.'})
+        return cleaned_data
+
+
+class InventoryAdjustmentForm(forms.ModelForm):
+    class Meta:
+        model = InventoryTransaction
+        fields = ['blood_group', 'delta', 'note']
+
+    def clean(self):
+        cleaned_data = super().clean()
+        group, delta = cleaned_data.get('blood_group'), cleaned_data.get('delta')
+        if group and delta is not None and delta < 0:
+            units = BloodInventory.objects.filter(blood_group=group).values_list('available_units', flat=True).first() or 0
+            if units + delta < 0:
+                raise forms.ValidationError({'delta': f'Only {units} units of {group} are in stock.'})
+        return cleaned_data
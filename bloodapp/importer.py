@@ -0,0 +1,203 @@
+import csv
+import json
+from datetime import datetime, time
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from accounts.models import CustomUser
+from . import counters, stats
+from .matching import COMPATIBLE_DONORS, normalize_group
+from .models import BloodDonation
+
+
+# Rows validated, looked up and inserted together; also the bulk_create size
+BATCH_SIZE = 1000
+# Only the first errors are kept for the report; the rest are just counted
+MAX_REPORTED_ERRORS = 500
+JSON_CHUNK_SIZE = 64 * 1024
+# No donation record comes close; more undecodable text than this is bad input
+MAX_JSON_OBJECT_SIZE = 1024 * 1024
+
+FORMATS = {'.csv': 'csv', '.json': 'json', '.jsonl': 'json', '.ndjson': 'json'}
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        self.donor_ids = set()
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+def detect_format(filename):
+    for suffix, fmt in FORMATS.items():
+        if filename.lower().endswith(suffix):
+            return fmt
+    raise ValueError(f'Unsupported file type: {filename} (expected CSV or JSON).')
+
+
+def read_rows(stream, fmt):
+    """Yield (line, row) pairs from a text stream without loading it whole."""
+    if fmt == 'csv':
+        # Line 1 is the header
+        return enumerate(csv.DictReader(stream), start=2)
+    return enumerate(_iter_json(stream), start=1)
+
+
+def _iter_json(stream):
+    """
+    Decode the objects of a top-level JSON array, or of JSON Lines, one at
+    a time from fixed-size reads.
+    """
+    decoder = json.JSONDecoder()
+    buffer, eof = '', False
+    while True:
+        buffer = buffer.lstrip(' \t\r\n,[]')
+        if buffer:
+            try:
+                obj, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                # Either the object continues in the next chunk, or the input
+                # is broken; don't keep reading to EOF to find out
+                if eof or len(buffer) > MAX_JSON_OBJECT_SIZE:
+                    raise ValueError('Invalid JSON near: ' + buffer[:40])
+            else:
+                yield obj
+                buffer = buffer[end:]
+                continue
+        elif eof:
+            return
+        chunk = stream.read(JSON_CHUNK_SIZE)
+        eof = not chunk
+        buffer += chunk
+
+
+def _parse_when(value):
+    value = (value or '').strip()
+    when = parse_datetime(value)
+    if when is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'invalid donation_date "{value}"')
+        when = datetime.combine(day, time.min)
+    if timezone.is_naive(when):
+        when = timezone.make_aware(when)
+    return when
+
+
+def _build_donation(row, donor_id):
+    blood_group = normalize_group(row.get('blood_group'))
+    if blood_group not in COMPATIBLE_DONORS:
+        raise ValueError(f'invalid blood_group "{row.get("blood_group")}"')
+    try:
+        quantity_ml = int(row.get('quantity_ml'))
+        hemoglobin_level = float(row.get('hemoglobin_level'))
+    except (TypeError, ValueError):
+        raise ValueError('quantity_ml and hemoglobin_level must be numbers')
+    if quantity_ml <= 0:
+        raise ValueError('quantity_ml must be positive')
+    blood_pressure = str(row.get('blood_pressure') or '').strip()
+    if not blood_pressure or len(blood_pressure) > 20:
+        raise ValueError('blood_pressure is required (max 20 characters)')
+
+    return BloodDonation(
+        donor_id=donor_id,
+        donation_date=_parse_when(row.get('donation_date')),
+        blood_group=blood_group,
+        quantity_ml=quantity_ml,
+        hemoglobin_level=hemoglobin_level,
+        blood_pressure=blood_pressure,
+        notes=str(row.get('notes') or ''),
+    )
+
+
+def _resolve_donors(keys):
+    """Map each username or phone number in ``keys`` to a user id in one query."""
+    by_username, by_phone, ambiguous = {}, {}, set()
+    users = (CustomUser.objects
+             .filter(Q(username__in=keys) | Q(phone_number__in=keys))
+             .values_list('id', 'username', 'phone_number'))
+    for user_id, username, phone in users:
+        by_username[username] = user_id
+        if phone in keys:
+            if phone in by_phone:
+                ambiguous.add(phone)
+            by_phone[phone] = user_id
+    for phone in ambiguous:
+        by_phone[phone] = None
+    return {**by_phone, **by_username}
+
+
+def _import_batch(batch, result, dry_run):
+    keys = {str(row.get('donor') or '').strip() for _, row in batch if isinstance(row, dict)}
+    donors = _resolve_donors(keys - {''})
+
+    donations = []
+    for line, row in batch:
+        if not isinstance(row, dict):
+            result.add_error(line, 'expected an object')
+            continue
+        key = str(row.get('donor') or '').strip()
+        if donors.get(key) is None:
+            message = 'phone number matches several users' if key in donors else f'unknown donor "{key}"'
+            result.add_error(line, message)
+            continue
+        try:
+            donations.append(_build_donation(row, donors[key]))
+        except ValueError as exc:
+            result.add_error(line, str(exc))
+
+    if donations and not dry_run:
+        BloodDonation.objects.bulk_create(donations, batch_size=BATCH_SIZE)
+        result.donor_ids.update(d.donor_id for d in donations)
+    result.created += len(donations)
+
+
+def import_donations(rows, batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Validate and insert BloodDonation rows from an iterable of (line, row)
+    pairs (see read_rows). Rows are consumed ``batch_size`` at a time, so
+    memory use doesn't grow with the row count. Invalid rows are skipped and
+    reported on the result; valid ones are imported.
+
+    The import is one transaction: if the file itself can't be read to the
+    end (malformed JSON or CSV, bad encoding), ValueError is raised and
+    nothing is imported, so the corrected file can simply be run again.
+    """
+    result = ImportResult()
+    last_line = 0
+
+    def tracked():
+        nonlocal last_line
+        for line, row in rows:
+            last_line = line
+            yield line, row
+
+    pending = tracked()
+    with transaction.atomic():
+        while True:
+            try:
+                batch = list(islice(pending, batch_size))
+            except (ValueError, csv.Error) as exc:
+                raise ValueError(f'{exc} (after row {last_line}); nothing was imported.')
+            if not batch:
+                break
+            _import_batch(batch, result, dry_run)
+
+        # bulk_create skips the signals that keep UserStats and the home page
+        # figures current, so refresh them once for everything inserted
+        if result.donor_ids:
+            donor_ids = sorted(result.donor_ids)
+            for start in range(0, len(donor_ids), batch_size):
+                counters.rebuild(donor_ids[start:start + batch_size])
+            transaction.on_commit(lambda: stats.invalidate(stats.DONATION_STATS_KEY))
+    return result
@@ -0,0 +1,117 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, F, Max, Q, Sum, Value, When
+from django.utils import timezone
+
+from . import stats
+from .models import BloodInventory, InventoryTransaction, InventorySnapshot
+
+
+# Millilitres of whole blood per inventory unit
+ML_PER_UNIT = 450
+
+
+class InsufficientStock(Exception):
+    pass
+
+
+def units_for_donation(donation):
+    return max(1, round(donation.quantity_ml / ML_PER_UNIT))
+
+
+def record(blood_group, delta, reason, *, donation=None, blood_request=None, user=None, note=''):
+    """
+    Append a ledger entry and apply ``delta`` to the blood group's stock in
+    the same transaction. The stock row is locked (select_for_update, where
+    the backend supports it) and changed with an F() expression, so
+    concurrent movements can't overwrite each other. Withdrawals only
+    apply while enough units remain; otherwise InsufficientStock is raised
+    and nothing is recorded.
+    """
+    with transaction.atomic():
+        inventory, _ = BloodInventory.objects.select_for_update().get_or_create(blood_group=blood_group)
+        stock = BloodInventory.objects.filter(pk=inventory.pk)
+        if delta < 0:
+            # Checked in the UPDATE itself, not against the row read above
+            stock = stock.filter(available_units__gte=-delta)
+        if not stock.update(available_units=F('available_units') + delta, last_updated=timezone.now()):
+            raise InsufficientStock(_shortage({blood_group: delta}, {blood_group: inventory.available_units}))
+        entry = InventoryTransaction.objects.create(
+            blood_group=blood_group, delta=delta, reason=reason,
+            donation=donation, blood_request=blood_request,
+            created_by=user, note=note,
+        )
+        # update() skips post_save, so drop the cached home page inventory here
+        transaction.on_commit(lambda: stats.invalidate(stats.INVENTORY_KEY))
+    return entry
+
+
+def record_many(entries):
+    """
+    Bulk version of record() for unsaved InventoryTransaction ``entries``:
+    the touched stock rows are locked together and moved by a single
+    UPDATE, then the ledger rows are inserted in one go. If any group would
+    go below zero, InsufficientStock is raised and nothing is recorded.
+    """
+    totals = Counter()
+    for entry in entries:
+        totals[entry.blood_group] += entry.delta
+    with transaction.atomic():
+        locked = dict(BloodInventory.objects.select_for_update()
+                      .filter(blood_group__in=totals).values_list('blood_group', 'available_units'))
+        missing = [group for group in totals if group not in locked]
+        if missing:
+            BloodInventory.objects.bulk_create([BloodInventory(blood_group=group) for group in missing],
+                                               ignore_conflicts=True)
+        enough = Q()
+        for group, delta in totals.items():
+            enough |= Q(blood_group=group, available_units__gte=-delta) if delta < 0 else Q(blood_group=group)
+        moved = BloodInventory.objects.filter(enough).update(
+            available_units=F('available_units') + Case(
+                *[When(blood_group=group, then=Value(delta)) for group, delta in totals.items()],
+                default=Value(0),
+            ),
+            last_updated=timezone.now(),
+        )
+        if moved != len(totals):
+            # Leave the atomic block by raising so the groups that did move roll back
+            raise InsufficientStock(_shortage(totals, locked))
+        created = InventoryTransaction.objects.bulk_create(entries, batch_size=500)
+        transaction.on_commit(lambda: stats.invalidate(stats.INVENTORY_KEY))
+    return created
+
+
+def _shortage(totals, stock):
+    """Error message for the groups in ``totals`` that ``stock`` (units by group, as locked) can't cover."""
+    short = [f'{group} needs {-delta}, has {stock.get(group, 0)}'
+             for group, delta in sorted(totals.items()) if stock.get(group, 0) + delta < 0]
+    # A concurrent withdrawal can win between the read and the UPDATE
+    return 'Not enough blood in stock' + (': ' + ', '.join(short) if short else '') + '.'
+
+
+def take_snapshot():
+    """Store every group's current stock against the latest ledger id."""
+    with transaction.atomic():
+        inventories = list(BloodInventory.objects.select_for_update())
+        last_id = InventoryTransaction.objects.aggregate(last=Max('id'))['last'] or 0
+        return InventorySnapshot.objects.bulk_create([
+            InventorySnapshot(
+                blood_group=inv.blood_group,
+                available_units=inv.available_units,
+                last_transaction_id=last_id,
+            )
+            for inv in inventories
+        ])
+
+
+def replay(blood_group):
+    """Rebuild a group's stock from its latest snapshot plus later ledger entries."""
+    snapshot = (InventorySnapshot.objects.filter(blood_group=blood_group)
+                .order_by('-last_transaction_id', '-id').first())
+    start_units = snapshot.available_units if snapshot else 0
+    after_id = snapshot.last_transaction_id if snapshot else 0
+    moved = (InventoryTransaction.objects
+             .filter(blood_group=blood_group, id__gt=after_id)
+             .aggregate(total=Sum('delta'))['total'] or 0)
+    return start_units + moved
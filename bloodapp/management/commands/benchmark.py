@@ -0,0 +1,61 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from crimsonbalance import benchmark
+
+
+def _change(percent):
+    return '-' if percent is None else f'{percent:+.1f}%'
+
+
+class Command(BaseCommand):
+    help = ('Load-test key pages in-process with concurrent test clients and report requests/s '
+            'and p50/p95/p99 latency per endpoint.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('endpoints', nargs='*', metavar='endpoint',
+                            help=f'Endpoints to run (default all): {", ".join(benchmark.ENDPOINT_NAMES)}.')
+        parser.add_argument('-n', '--requests', type=int, default=200, help='Timed requests per endpoint.')
+        parser.add_argument('-c', '--concurrency', type=int, default=4, help='Concurrent clients.')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per client first.')
+        parser.add_argument('--host', help='Host header; defaults to the first ALLOWED_HOSTS entry.')
+        parser.add_argument('-o', '--output', help='Write the JSON report to this file.')
+        parser.add_argument('--compare', help='Earlier JSON report to compare against.')
+
+    def handle(self, *args, **options):
+        unknown = set(options['endpoints']) - set(benchmark.ENDPOINT_NAMES)
+        if unknown:
+            raise CommandError(f'Unknown endpoint(s): {", ".join(sorted(unknown))}.')
+        if options['requests'] < 1 or options['concurrency'] < 1 or options['warmup'] < 0:
+            raise CommandError('--requests and --concurrency must be positive, --warmup not negative.')
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+
+        self.stdout.write(f'{"endpoint":<26} {"req/s":>8} {"p50":>8} {"p95":>8} {"p99":>8} {"errors":>6}')
+
+        def log(name, entry):
+            latency = entry['latency_ms']
+            self.stdout.write(
+                f'{name:<26} {entry["requests_per_second"] or 0:>8.1f} {latency["p50"]:>8.2f} '
+                f'{latency["p95"]:>8.2f} {latency["p99"]:>8.2f} {entry["errors"]:>6}')
+
+        try:
+            report = benchmark.run(
+                names=options['endpoints'] or None, requests=options['requests'],
+                concurrency=options['concurrency'], warmup=options['warmup'],
+                host=options['host'], log=log,
+            )
+        except benchmark.MissingFixture as exc:
+            raise CommandError(str(exc))
+
+        if baseline:
+            self.stdout.write(f'\nAgainst {options["compare"]}:')
+            for name, rps, p95 in benchmark.compare(report, baseline):
+                self.stdout.write(f'{name:<26} req/s {_change(rps):>8}  p95 {_change(p95):>8}')
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {options["output"]}.'))
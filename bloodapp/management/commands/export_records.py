@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bloodapp import export
+
+
+class Command(BaseCommand):
+    help = 'Stream donations, requests or appointments to CSV for reporting.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(export.EXPORTS))
+        parser.add_argument('--from', dest='from', help='First date to include (YYYY-MM-DD).')
+        parser.add_argument('--to', dest='to', help='Last date to include (YYYY-MM-DD).')
+        parser.add_argument('--filter', action='append', default=[], metavar='NAME=VALUE',
+                            help='Export specific filter, e.g. blood_group=O-, status=pending, '
+                                 'fulfilled=no (repeatable).')
+        parser.add_argument('-o', '--output', help='File to write; defaults to stdout.')
+
+    def handle(self, *args, **options):
+        params = {'from': options['from'], 'to': options['to']}
+        allowed = export.EXPORTS[options['kind']]['filters']
+        for item in options['filter']:
+            name, sep, value = item.partition('=')
+            if not sep or name not in allowed:
+                raise CommandError(f'Unknown filter "{item}"; {options["kind"]} accepts: {", ".join(allowed)}.')
+            params[name] = value
+
+        try:
+            queryset = export.export_queryset(options['kind'], params)
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        output = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            for chunk in export.csv_chunks(options['kind'], queryset):
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout:
+                output.close()
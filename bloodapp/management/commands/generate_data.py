@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bloodapp.synthetic import DEFAULT_COUNTS, Generator
+
+
+class Command(BaseCommand):
+    help = 'Bulk-create a synthetic population of users, donations, requests, appointments, posts and chats.'
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_COUNTS.items():
+            parser.add_argument(f'--{name}', type=int, default=default, help=f'Default {default}.')
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help='Multiply every count, e.g. 0.1 for a quick run or 10 for a large one.')
+        parser.add_argument('--prefix', default='synth', help='Username prefix marking the generated users.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed gives the same data.')
+        parser.add_argument('--days', type=int, default=365, help='History spread over this many days.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['scale'] <= 0 or options['batch_size'] < 1 or options['days'] < 1:
+            raise CommandError('--scale, --batch-size and --days must be positive.')
+        counts = {name: max(0, round(options[name] * options['scale'])) for name in DEFAULT_COUNTS}
+
+        generator = Generator(prefix=options['prefix'], seed=options['seed'],
+                              batch_size=options['batch_size'], days=options['days'])
+        started = time.perf_counter()
+        try:
+            generator.run(counts, log=lambda message: self.stdout.write(f'  {message}'))
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated synthetic data in {time.perf_counter() - started:.1f}s.'))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bloodapp import importer
+
+
+class Command(BaseCommand):
+    help = ('Import BloodDonation rows from a CSV or JSON (array or JSON Lines) file. Columns: '
+            'donor (username or phone), donation_date, blood_group, quantity_ml, '
+            'hemoglobin_level, blood_pressure, notes.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'json'],
+                            help='File format; guessed from the extension by default.')
+        parser.add_argument('--batch-size', type=int, default=importer.BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Validate every row without inserting anything.')
+
+    def handle(self, *args, **options):
+        try:
+            fmt = options['format'] or importer.detect_format(options['path'])
+            with open(options['path'], newline='', encoding='utf-8-sig') as stream:
+                result = importer.import_donations(
+                    importer.read_rows(stream, fmt),
+                    batch_size=options['batch_size'],
+                    dry_run=options['dry_run'],
+                )
+        except (OSError, ValueError) as exc:
+            raise CommandError(exc)
+
+        for line, message in result.errors:
+            self.stderr.write(f'Row {line}: {message}')
+        if result.error_count > len(result.errors):
+            self.stderr.write(f'... and {result.error_count - len(result.errors)} more errors')
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {result.created} donations; {result.error_count} rows rejected.'))
@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from bloodapp.models import AppointmentSlot
+
+
+class Command(BaseCommand):
+    help = 'Create appointment slots with the given daily capacity; existing slots are left alone.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='from', required=True, help='First day (YYYY-MM-DD).')
+        parser.add_argument('--to', dest='to', required=True, help='Last day, inclusive (YYYY-MM-DD).')
+        parser.add_argument('--capacity', type=int, required=True, help='Appointments per type per day.')
+        parser.add_argument('--type', action='append', dest='types',
+                            choices=[value for value, _ in AppointmentSlot.TYPE_CHOICES],
+                            help='Appointment type (repeatable); defaults to every type.')
+        parser.add_argument('--skip-weekends', action='store_true')
+
+    def handle(self, *args, **options):
+        start, end = parse_date(options['from'] or ''), parse_date(options['to'] or '')
+        if start is None or end is None or end < start:
+            raise CommandError('--from and --to must be dates with --from <= --to.')
+        if options['capacity'] < 1:
+            raise CommandError('--capacity must be at least 1.')
+        types = options['types'] or [value for value, _ in AppointmentSlot.TYPE_CHOICES]
+
+        slots = []
+        day = start
+        while day <= end:
+            if not (options['skip_weekends'] and day.weekday() >= 5):
+                slots.extend(AppointmentSlot(date=day, appointment_type=t, capacity=options['capacity'])
+                             for t in types)
+            day += timedelta(days=1)
+
+        before = AppointmentSlot.objects.count()
+        AppointmentSlot.objects.bulk_create(slots, batch_size=500, ignore_conflicts=True)
+        created = AppointmentSlot.objects.count() - before
+        self.stdout.write(self.style.SUCCESS(f'Opened {created} slots ({len(slots) - created} already existed).'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from bloodapp import counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized per-user counters (UserStats) from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='Only rebuild the given user id (repeatable).')
+
+    def handle(self, *args, **options):
+        rebuilt = counters.rebuild(options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {rebuilt} users.'))
@@ -0,0 +1,70 @@
+from datetime import datetime, time
+
+from django.db.models import Case, Exists, F, IntegerField, OuterRef, Q, Value, When
+from django.utils import timezone
+
+from accounts.models import CustomUser, normalize_blood_group
+from .models import BloodDonation, DONATION_INTERVAL
+
+# Red cell compatibility: recipient group -> donor groups it can receive from
+COMPATIBLE_DONORS = {
+    'O-': ('O-',),
+    'O+': ('O-', 'O+'),
+    'A-': ('O-', 'A-'),
+    'A+': ('O-', 'O+', 'A-', 'A+'),
+    'B-': ('O-', 'B-'),
+    'B+': ('O-', 'O+', 'B-', 'B+'),
+    'AB-': ('O-', 'A-', 'B-', 'AB-'),
+    'AB+': ('O-', 'O+', 'A-', 'A+', 'B-', 'B+', 'AB-', 'AB+'),
+}
+
+# Urgent requests also reach unverified donors and return a longer list
+URGENT_LEVELS = ('high', 'critical')
+MATCH_LIMIT = {'low': 25, 'medium': 25, 'high': 50, 'critical': 100}
+
+
+# Requests are free text too; read their groups the way user profiles are stored
+normalize_group = normalize_blood_group
+
+
+def eligible_donors(as_of=None):
+    """
+    Active donors whose next eligible date has passed by ``as_of`` (default
+    now). A missing date means either no donations or no UserStats row, so
+    those donors are checked against their donations directly.
+    """
+    as_of = as_of or timezone.now()
+    recent = BloodDonation.objects.filter(donor=OuterRef('pk'), donation_date__gt=as_of - DONATION_INTERVAL)
+    return (CustomUser.objects
+            .filter(user_type='donor', is_active=True)
+            .filter(Q(stats__next_eligible_date__lte=as_of) |
+                    (Q(stats__next_eligible_date__isnull=True) & ~Exists(recent))))
+
+
+def match_donors(blood_request, limit=None):
+    """
+    Return ranked donors able to give to ``blood_request`` by its required
+    date, in a single query: exact group first, then donors in the
+    recipient's city, verified donors, and those who gave longest ago.
+    """
+    group = normalize_group(blood_request.blood_group)
+    compatible = COMPATIBLE_DONORS.get(group)
+    if not compatible:
+        return CustomUser.objects.none()
+
+    required = timezone.make_aware(datetime.combine(blood_request.required_date, time.max))
+    donors = eligible_donors(required).filter(blood_group__in=compatible)
+    if blood_request.urgency not in URGENT_LEVELS:
+        donors = donors.filter(is_verified=True)
+
+    city = blood_request.recipient.city
+    donors = donors.annotate(
+        exact_match=Case(When(blood_group=group, then=Value(0)), default=Value(1), output_field=IntegerField()),
+        same_city=Case(When(city__iexact=city, then=Value(0)), default=Value(1), output_field=IntegerField())
+        if city else Value(1, output_field=IntegerField()),
+    ).select_related('stats').order_by(
+        'exact_match', 'same_city', '-is_verified',
+        # Never-donated donors first, then whoever gave longest ago
+        F('stats__last_donation_date').asc(nulls_first=True), 'username',
+    )
+    return donors[:limit or MATCH_LIMIT.get(blood_request.urgency, 25)]
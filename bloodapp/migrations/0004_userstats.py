@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-18 10:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('bloodapp', '0003_remove_appointment_is_featured_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('donation_count', models.IntegerField(default=0)),
+                ('last_donation_date', models.DateTimeField(blank=True, null=True)),
+                ('request_count', models.IntegerField(default=0)),
+                ('fulfilled_request_count', models.IntegerField(default=0)),
+                ('appointment_count', models.IntegerField(default=0)),
+                ('pending_appointments', models.IntegerField(default=0)),
+                ('confirmed_appointments', models.IntegerField(default=0)),
+                ('completed_appointments', models.IntegerField(default=0)),
+                ('cancelled_appointments', models.IntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 6.0 on 2026-10-18 10:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bloodapp', '0004_userstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['user', 'scheduled_date'], name='appt_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['user', 'status'], name='appt_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['scheduled_date', 'id'], name='appt_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blooddonation',
+            index=models.Index(fields=['donor', 'donation_date'], name='donation_donor_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blooddonation',
+            index=models.Index(fields=['donation_date', 'id'], name='donation_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bloodrequest',
+            index=models.Index(fields=['recipient', 'required_date'], name='request_recipient_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bloodrequest',
+            index=models.Index(fields=['required_date', 'id'], name='request_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='informationpost',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['created_at'], name='post_published_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='informationpost',
+            index=models.Index(condition=models.Q(('is_featured', True), ('is_published', True)), fields=['created_at'], name='post_featured_created_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-18 10:00
+
+from django.db import migrations
+
+
+FTS_TABLE = 'bloodapp_informationpost_fts'
+
+
+def create_fts(apps, schema_editor):
+    # Full-text search is SQLite (FTS5) only; other backends fall back to LIKE
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    InformationPost = apps.get_model('bloodapp', 'InformationPost')
+    User = apps.get_model('accounts', 'CustomUser')
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+        f"USING fts5(title, content, author, tokenize='porter unicode61')"
+    )
+    posts, users = InformationPost._meta.db_table, User._meta.db_table
+    schema_editor.execute(
+        f'INSERT INTO {FTS_TABLE} (rowid, title, content, author) '
+        f'SELECT p.id, p.title, p.content, u.username FROM {posts} p JOIN {users} u ON u.id = p.author_id'
+    )
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_type_index'),
+        ('bloodapp', '0005_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
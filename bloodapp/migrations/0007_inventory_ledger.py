@@ -0,0 +1,58 @@
+# Generated by Django 6.0 on 2026-10-18 10:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def record_opening_balances(apps, schema_editor):
+    # Seed the ledger with today's hand-maintained stock so replays add up
+    BloodInventory = apps.get_model('bloodapp', 'BloodInventory')
+    InventoryTransaction = apps.get_model('bloodapp', 'InventoryTransaction')
+    InventoryTransaction.objects.bulk_create([
+        InventoryTransaction(blood_group=inv.blood_group, delta=inv.available_units,
+                             reason='adjustment', note='Opening balance')
+        for inv in BloodInventory.objects.all()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bloodapp', '0006_informationpost_fts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventorySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('blood_group', models.CharField(max_length=5)),
+                ('available_units', models.IntegerField()),
+                ('last_transaction_id', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['blood_group', 'last_transaction_id'], name='inventory_snapshot_group_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='InventoryTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('blood_group', models.CharField(max_length=5)),
+                ('delta', models.IntegerField()),
+                ('reason', models.CharField(choices=[('donation', 'Donation processed'), ('request', 'Request fulfilled'), ('adjustment', 'Manual adjustment')], max_length=20)),
+                ('note', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('blood_request', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='inventory_transactions', to='bloodapp.bloodrequest')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('donation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='inventory_transactions', to='bloodapp.blooddonation')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['blood_group', 'id'], name='inventory_txn_group_idx')],
+            },
+        ),
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bloodapp', '0007_inventory_ledger'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userstats',
+            name='last_donation_date',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
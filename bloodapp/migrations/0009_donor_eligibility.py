@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-18 10:00
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_eligibility(apps, schema_editor):
+    UserStats = apps.get_model('bloodapp', 'UserStats')
+    BloodDonation = apps.get_model('bloodapp', 'BloodDonation')
+    totals = dict(BloodDonation.objects.values('donor_id')
+                  .annotate(total=Sum('quantity_ml')).values_list('donor_id', 'total'))
+    for stats in UserStats.objects.filter(last_donation_date__isnull=False):
+        stats.total_donated_ml = totals.get(stats.user_id) or 0
+        stats.next_eligible_date = stats.last_donation_date + timedelta(days=56)
+        stats.save(update_fields=['total_donated_ml', 'next_eligible_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bloodapp', '0008_donor_matching_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userstats',
+            name='next_eligible_date',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userstats',
+            name='total_donated_ml',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='userstats',
+            name='last_donation_date',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_eligibility, migrations.RunPython.noop),
+    ]
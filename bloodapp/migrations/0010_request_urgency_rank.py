@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-18 10:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+URGENCY_RANK = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+
+def backfill_urgency_rank(apps, schema_editor):
+    BloodRequest = apps.get_model('bloodapp', 'BloodRequest')
+    for urgency, rank in URGENCY_RANK.items():
+        BloodRequest.objects.filter(urgency=urgency).update(urgency_rank=rank)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bloodapp', '0009_donor_eligibility'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bloodrequest',
+            name='urgency_rank',
+            field=models.PositiveSmallIntegerField(default=4, editable=False),
+        ),
+        migrations.RunPython(backfill_urgency_rank, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='bloodrequest',
+            index=models.Index(condition=models.Q(('is_fulfilled', False)), fields=['urgency_rank', 'required_date', 'id'], name='request_open_queue_idx'),
+        ),
+    ]
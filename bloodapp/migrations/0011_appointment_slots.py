@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-18 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bloodapp', '0010_request_urgency_rank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('appointment_type', models.CharField(choices=[('whole_blood', 'Whole Blood Donation'), ('platelets', 'Platelet Donation'), ('plasma', 'Plasma Donation'), ('double_red', 'Double Red Cell')], max_length=50)),
+                ('capacity', models.PositiveIntegerField()),
+                ('booked', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['date', 'appointment_type'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'appointment_type'), name='unique_slot_per_day'), models.CheckConstraint(condition=models.Q(('booked__lte', models.F('capacity'))), name='slot_not_overbooked')],
+            },
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='slot',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='appointments', to='bloodapp.appointmentslot'),
+        ),
+    ]
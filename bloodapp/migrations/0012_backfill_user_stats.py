@@ -0,0 +1,62 @@
+# Generated by Django 6.0 on 2026-10-18 10:00
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import migrations
+from django.db.models import Count, Max, Q, Sum
+
+
+# Frozen copies of the values in bloodapp.models and bloodapp.counters at
+# the time of this migration
+DONATION_INTERVAL = timedelta(days=56)
+APPOINTMENT_STATUS_FIELDS = {
+    'pending': 'pending_appointments',
+    'confirmed': 'confirmed_appointments',
+    'completed': 'completed_appointments',
+    'cancelled': 'cancelled_appointments',
+}
+
+
+def backfill_user_stats(apps, schema_editor):
+    # 0004 created UserStats empty; counters are only ever adjusted by
+    # deltas, so every user with history needs a row computed from scratch.
+    BloodDonation = apps.get_model('bloodapp', 'BloodDonation')
+    BloodRequest = apps.get_model('bloodapp', 'BloodRequest')
+    Appointment = apps.get_model('bloodapp', 'Appointment')
+    UserStats = apps.get_model('bloodapp', 'UserStats')
+
+    stats = defaultdict(dict)
+    donations = BloodDonation.objects.values('donor_id').annotate(
+        donation_count=Count('id'), total_donated_ml=Sum('quantity_ml'),
+        last_donation_date=Max('donation_date'))
+    requests = BloodRequest.objects.values('recipient_id').annotate(
+        request_count=Count('id'),
+        fulfilled_request_count=Count('id', filter=Q(is_fulfilled=True)))
+    appointments = Appointment.objects.values('user_id').annotate(
+        appointment_count=Count('id'),
+        **{field: Count('id', filter=Q(status=status))
+           for status, field in APPOINTMENT_STATUS_FIELDS.items()})
+    for rows, key in ((donations, 'donor_id'), (requests, 'recipient_id'), (appointments, 'user_id')):
+        for row in rows:
+            stats[row.pop(key)].update(row)
+    for values in stats.values():
+        if values.get('last_donation_date'):
+            values['next_eligible_date'] = values['last_donation_date'] + DONATION_INTERVAL
+
+    UserStats.objects.all().delete()
+    UserStats.objects.bulk_create(
+        [UserStats(user_id=user_id, **values) for user_id, values in stats.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bloodapp', '0011_appointment_slots'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_user_stats, reverse_code=migrations.RunPython.noop),
+    ]
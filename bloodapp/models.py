@@ -1,10 +1,41 @@
-from django.db import models
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.db.models import Count, Q
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
 
 User = get_user_model()
 
+# Minimum gap between whole-blood donations
+DONATION_INTERVAL = timedelta(days=56)
+
+
+class BloodRequestQuerySet(models.QuerySet):
+    def open_queue(self):
+        """Unfulfilled requests, most urgent first, then soonest required."""
+        return (self.filter(is_fulfilled=False)
+                .order_by('urgency_rank', 'required_date', 'id'))
+
+    def status_breakdown(self):
+        """Total, fulfilled and pending counts in a single aggregate query."""
+        return self.aggregate(
+            total=Count('id'),
+            fulfilled=Count('id', filter=Q(is_fulfilled=True)),
+            pending=Count('id', filter=Q(is_fulfilled=False)),
+        )
+
+
+class AppointmentQuerySet(models.QuerySet):
+    def status_breakdown(self):
+        """Total plus one count per status in a single aggregate query."""
+        buckets = {'total': Count('id')}
+        for status, _ in self.model.STATUS_CHOICES:
+            buckets[status] = Count('id', filter=Q(status=status))
+        return self.aggregate(**buckets)
+
+
 class BloodDonation(models.Model):
     donor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='donations')
     donation_date = models.DateTimeField()
@@ -15,6 +46,12 @@ class BloodDonation(models.Model):
     is_processed = models.BooleanField(default=False)
     processed_date = models.DateTimeField(null=True, blank=True)
     notes = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['donor', 'donation_date'], name='donation_donor_date_idx'),
+            models.Index(fields=['donation_date', 'id'], name='donation_date_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.donor.username} - {self.donation_date}"
@@ -26,6 +63,8 @@ class BloodRequest(models.Model):
         ('high', 'High'),
         ('critical', 'Critical'),
     )
+    # Queue order: lower rank is served first
+    URGENCY_RANK = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
     
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='requests')
     blood_group = models.CharField(max_length=5)
@@ -39,10 +78,34 @@ class BloodRequest(models.Model):
     patient_name = models.CharField(max_length=200)
     patient_age = models.IntegerField()
     medical_condition = models.TextField()
+    # Stored copy of URGENCY_RANK[urgency] so the open queue is an index scan
+    urgency_rank = models.PositiveSmallIntegerField(default=len(URGENCY_RANK), editable=False)
+
+    objects = BloodRequestQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', 'required_date'], name='request_recipient_date_idx'),
+            models.Index(fields=['required_date', 'id'], name='request_date_id_idx'),
+            models.Index(fields=['urgency_rank', 'required_date', 'id'], name='request_open_queue_idx',
+                         condition=Q(is_fulfilled=False)),
+        ]
     
     def __str__(self):
         return f"{self.patient_name} - {self.blood_group}"
 
+    @classmethod
+    def rank_for(cls, urgency):
+        return cls.URGENCY_RANK.get(urgency, len(cls.URGENCY_RANK))
+
+    def save(self, *args, **kwargs):
+        self.urgency_rank = self.rank_for(self.urgency)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'urgency' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'urgency_rank'}
+        super().save(*args, **kwargs)
+
+
 class InformationPost(models.Model):
     CATEGORY_CHOICES = (
         ('general', 'General Information'),
@@ -62,6 +125,17 @@ class InformationPost(models.Model):
     image = models.ImageField(upload_to='info_posts/', blank=True)
 
     is_featured = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # Partial rather than (is_published, ...) composites: boolean
+            # filters compile to a bare "WHERE is_published", which SQLite
+            # can only match against an index's WHERE clause.
+            models.Index(fields=['created_at'], name='post_published_created_idx',
+                         condition=Q(is_published=True)),
+            models.Index(fields=['created_at'], name='post_featured_created_idx',
+                         condition=Q(is_published=True, is_featured=True)),
+        ]
     
     def __str__(self):
         return self.title
@@ -89,11 +163,62 @@ class Appointment(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # The day's capacity this booking holds (see bloodapp.scheduling)
+    slot = models.ForeignKey('AppointmentSlot', on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name='appointments')
+
+    objects = AppointmentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'scheduled_date'], name='appt_user_date_idx'),
+            models.Index(fields=['user', 'status'], name='appt_user_status_idx'),
+            models.Index(fields=['scheduled_date', 'id'], name='appt_date_id_idx'),
+        ]
 
-    
     def __str__(self):
         return f"{self.user.username} - {self.appointment_type}"
 
+    def save(self, *args, **kwargs):
+        # The row and its slot place change together: a full slot raises
+        # SlotUnavailable and rolls the save back
+        from .counters import snapshot
+        from .scheduling import move_place
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            # _stats_old is read by bloodapp.signals before the row is written
+            move_place(getattr(self, '_stats_old', None), snapshot(self))
+
+
+class AppointmentSlot(models.Model):
+    """Bookable capacity for one appointment type on one day."""
+    TYPE_CHOICES = (
+        ('whole_blood', 'Whole Blood Donation'),
+        ('platelets', 'Platelet Donation'),
+        ('plasma', 'Plasma Donation'),
+        ('double_red', 'Double Red Cell'),
+    )
+
+    date = models.DateField()
+    appointment_type = models.CharField(max_length=50, choices=TYPE_CHOICES)
+    capacity = models.PositiveIntegerField()
+    booked = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['date', 'appointment_type']
+        constraints = [
+            # Also the index availability range scans use (date first)
+            models.UniqueConstraint(fields=['date', 'appointment_type'], name='unique_slot_per_day'),
+            models.CheckConstraint(condition=Q(booked__lte=models.F('capacity')), name='slot_not_overbooked'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.get_appointment_type_display()}: {self.booked}/{self.capacity}"
+
+    @property
+    def available(self):
+        return self.capacity - self.booked
+
 class BloodInventory(models.Model):
     blood_group = models.CharField(max_length=5, unique=True)
     available_units = models.IntegerField(default=0)
@@ -104,4 +229,84 @@ class BloodInventory(models.Model):
         return f"{self.blood_group}: {self.available_units} units"
     
     def is_critical(self):
-        return self.available_units <= self.critical_level
\ No newline at end of file
+        return self.available_units <= self.critical_level
+
+
+class UserStats(models.Model):
+    """
+    Denormalized per-user counters, kept current by bloodapp.signals and
+    rebuilt from scratch by the rebuild_user_stats command.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    donation_count = models.IntegerField(default=0)
+    total_donated_ml = models.IntegerField(default=0)
+    last_donation_date = models.DateTimeField(null=True, blank=True)
+    # last_donation_date + DONATION_INTERVAL; indexed for "who can donate now"
+    next_eligible_date = models.DateTimeField(null=True, blank=True, db_index=True)
+    request_count = models.IntegerField(default=0)
+    fulfilled_request_count = models.IntegerField(default=0)
+    appointment_count = models.IntegerField(default=0)
+    pending_appointments = models.IntegerField(default=0)
+    confirmed_appointments = models.IntegerField(default=0)
+    completed_appointments = models.IntegerField(default=0)
+    cancelled_appointments = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Stats for {self.user.username}"
+
+    @property
+    def pending_request_count(self):
+        return self.request_count - self.fulfilled_request_count
+
+    @classmethod
+    def for_user(cls, user):
+        try:
+            return cls.objects.get(user=user)
+        except cls.DoesNotExist:
+            # First visit since the table was added: seed it from the source rows
+            from .counters import rebuild
+            rebuild([user.pk])
+            stats, _ = cls.objects.get_or_create(user=user)
+            return stats
+
+
+class InventoryTransaction(models.Model):
+    """Append-only ledger of stock movements; BloodInventory holds the running total."""
+    REASON_CHOICES = (
+        ('donation', 'Donation processed'),
+        ('request', 'Request fulfilled'),
+        ('adjustment', 'Manual adjustment'),
+    )
+
+    blood_group = models.CharField(max_length=5)
+    delta = models.IntegerField()
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    donation = models.ForeignKey(BloodDonation, on_delete=models.SET_NULL, null=True, blank=True, related_name='inventory_transactions')
+    blood_request = models.ForeignKey(BloodRequest, on_delete=models.SET_NULL, null=True, blank=True, related_name='inventory_transactions')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    note = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['blood_group', 'id'], name='inventory_txn_group_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.blood_group} {self.delta:+d} ({self.reason})"
+
+
+class InventorySnapshot(models.Model):
+    """Stock per blood group as of ``last_transaction_id``, the replay starting point."""
+    blood_group = models.CharField(max_length=5)
+    available_units = models.IntegerField()
+    last_transaction_id = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['blood_group', 'last_transaction_id'], name='inventory_snapshot_group_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.blood_group}: {self.available_units} units @ {self.created_at}"
@@ -0,0 +1,53 @@
+import base64
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+PAGE_SIZE = 25
+
+
+def encode_cursor(value, pk):
+    # Opaque cursor: "<ordering value>|<id>" in url-safe base64
+    raw = f"{value.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        value, pk = raw.rsplit('|', 1)
+        return value, int(pk)
+    except (ValueError, UnicodeError):
+        return None
+
+
+def keyset_page(queryset, field, cursor=None, page_size=PAGE_SIZE):
+    """
+    Return (rows, next_cursor) for ``queryset`` ordered newest first on
+    ``(field, id)``. Seeking past the cursor keeps every page an index range
+    scan, unlike OFFSET which re-reads all earlier rows.
+    """
+    queryset = queryset.order_by(f'-{field}', '-id')
+
+    decoded = decode_cursor(cursor) if cursor else None
+    if decoded:
+        value, pk = decoded
+        try:
+            value = queryset.model._meta.get_field(field).to_python(value)
+        except ValidationError:
+            value = None
+        if value is not None:
+            queryset = queryset.filter(
+                Q(**{f'{field}__lt': value}) |
+                Q(**{field: value, 'id__lt': pk})
+            )
+
+    # Fetch one extra row to know whether another page exists
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return rows, next_cursor
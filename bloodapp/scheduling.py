@@ -0,0 +1,99 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Appointment, AppointmentSlot
+
+
+# Widest window the availability API will scan
+MAX_AVAILABILITY_DAYS = 62
+
+# Capacity of a day's slot opened by its first booking; the open_slots
+# command sets capacities ahead of time
+DEFAULT_SLOT_CAPACITY = 20
+
+
+class SlotUnavailable(Exception):
+    pass
+
+
+def availability(start, end, appointment_type=None):
+    """
+    Slots with room left on days in [start, end), in one range scan of the
+    (date, appointment_type) unique index.
+    """
+    slots = AppointmentSlot.objects.filter(date__gte=start, date__lt=end, booked__lt=F('capacity'))
+    if appointment_type:
+        slots = slots.filter(appointment_type=appointment_type)
+    return slots.order_by('date', 'appointment_type')
+
+
+def book(user, appointment_type, scheduled_date, notes=''):
+    """
+    Create the appointment in the day's slot, opening it with
+    DEFAULT_SLOT_CAPACITY if open_slots hasn't. Saving claims the place
+    (see move_place), so concurrent bookings can't oversell a slot; raises
+    SlotUnavailable when it's full.
+    """
+    day = timezone.localtime(scheduled_date).date()
+    with transaction.atomic():
+        slot, _ = AppointmentSlot.objects.get_or_create(
+            date=day, appointment_type=appointment_type, defaults={'capacity': DEFAULT_SLOT_CAPACITY})
+        if slot.available <= 0:
+            raise SlotUnavailable(f'No {appointment_type.replace("_", " ")} slots are left on {day:%b %d, %Y}.')
+        return Appointment.objects.create(
+            user=user,
+            appointment_type=appointment_type,
+            scheduled_date=scheduled_date,
+            notes=notes or '',
+            slot=slot,
+        )
+
+
+def holds_place(values):
+    """Whether an appointment with these tracked values occupies a slot place."""
+    return values is not None and values['slot_id'] is not None and values['status'] != 'cancelled'
+
+
+def move_place(old=None, new=None):
+    """
+    Keep AppointmentSlot.booked in step with one appointment going from
+    ``old`` to ``new`` tracked values (None for create/delete); called by
+    Appointment.save() in the same transaction as the row, and for deletes
+    from bloodapp.signals. The place is claimed by a conditional UPDATE
+    (booked < capacity) and SlotUnavailable raised if the slot is full.
+    """
+    released = old['slot_id'] if holds_place(old) else None
+    claimed = new['slot_id'] if holds_place(new) else None
+    if released == claimed:
+        return
+    if released is not None:
+        AppointmentSlot.objects.filter(pk=released, booked__gt=0).update(booked=F('booked') - 1)
+    if claimed is not None:
+        if not AppointmentSlot.objects.filter(pk=claimed, booked__lt=F('capacity')).update(booked=F('booked') + 1):
+            raise SlotUnavailable('That appointment slot is already full.')
+
+
+def apply_status_changes(changes):
+    """
+    move_place() for queryset.update()s, which send no signals: keep slot
+    counts in step with appointment status changes, given as
+    (slot_id, old_status, new_status). Cancelling frees a place;
+    reinstating a cancelled appointment takes one back and raises
+    SlotUnavailable if the slot has since filled up.
+    """
+    deltas = Counter()
+    for slot_id, old, new in changes:
+        if slot_id is None or (old == 'cancelled') == (new == 'cancelled'):
+            continue
+        deltas[slot_id] += 1 if old == 'cancelled' else -1
+    for slot_id, delta in deltas.items():
+        if not delta:
+            continue
+        slots = AppointmentSlot.objects.filter(pk=slot_id)
+        if delta > 0:
+            slots = slots.filter(booked__lte=F('capacity') - delta)
+        if not slots.update(booked=F('booked') + delta):
+            raise SlotUnavailable('The slot for a reinstated appointment is already full.')
@@ -0,0 +1,126 @@
+import re
+
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+
+# FTS5 table mirroring InformationPost (rowid = post id), created by
+# migration 0006 and kept current by bloodapp.signals.
+FTS_TABLE = 'bloodapp_informationpost_fts'
+
+# Control characters can't appear in posts, so they're safe highlight markers
+MARK_START, MARK_END = '\x02', '\x03'
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(text):
+    """Turn free text into an FTS5 query of quoted prefix terms."""
+    terms = re.findall(r'\w+', text)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def index_post(post):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, content, author) VALUES (%s, %s, %s, %s)',
+            [post.pk, post.title, post.content, post.author.username],
+        )
+
+
+def remove_post(post_id):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id])
+
+
+def search_posts(queryset, text):
+    """
+    Posts from ``queryset`` matching ``text`` as SearchResults, best match
+    first. Returns None if the text has no searchable terms.
+    """
+    match = build_match_query(text)
+    if not match:
+        return None
+    return SearchResults(queryset, match)
+
+
+class SearchResults:
+    """
+    Ranked matches that Paginator can count and slice. Ranking reads the FTS
+    index once per query (bm25 is only valid in the MATCH scan, so it can't
+    be a correlated subquery without re-running the MATCH for every row);
+    posts and their ``search_snippet`` are then loaded for the page alone.
+    """
+
+    def __init__(self, queryset, match):
+        self.queryset = queryset
+        self.match = match
+        self._count = None
+
+    def _hits(self, select, tail='', params=()):
+        # Materialized so the MATCH runs once rather than per candidate post
+        posts_sql, posts_params = self.queryset.order_by().values('id').query.sql_with_params()
+        sql = (
+            f'WITH hits AS MATERIALIZED ('
+            f'SELECT rowid AS id, bm25({FTS_TABLE}, 10.0, 1.0, 2.0) AS rank '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s) '
+            f'SELECT {select} FROM hits WHERE id IN ({posts_sql}) {tail}'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [self.match, *posts_params, *params])
+            return cursor.fetchall()
+
+    def _snippets(self, ids):
+        placeholders = ', '.join(['%s'] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, snippet({FTS_TABLE}, 1, '{MARK_START}', '{MARK_END}', '...', 24) "
+                f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid IN ({placeholders})',
+                [self.match, *ids],
+            )
+            return dict(cursor.fetchall())
+
+    def count(self):
+        if self._count is None:
+            self._count = self._hits('count(*)')[0][0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            page = self[index:index + 1]
+            if not page:
+                raise IndexError(index)
+            return page[0]
+        start = index.start or 0
+        stop = index.stop if index.stop is not None else self.count()
+        if stop <= start:
+            return []
+        # Ties go to the newest post, as the unsearched list is ordered
+        ids = [row[0] for row in self._hits('id', 'ORDER BY rank, id DESC LIMIT %s OFFSET %s', [stop - start, start])]
+        if not ids:
+            return []
+        posts = self.queryset.in_bulk(ids)
+        snippets = self._snippets(ids)
+        page = []
+        for post_id in ids:
+            post = posts[post_id]
+            post.search_snippet = snippets.get(post_id)
+            page.append(post)
+        return page
+
+
+def highlight(snippet):
+    """Escape an FTS snippet and turn its markers into <mark> tags."""
+    html = escape(snippet or '')
+    return mark_safe(html.replace(MARK_START, '<mark>').replace(MARK_END, '</mark>'))
@@ -0,0 +1,93 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from accounts.models import CustomUser
+from . import counters, scheduling, search, stats
+from .models import BloodDonation, BloodRequest, BloodInventory, Appointment, InformationPost
+
+
+def _invalidate_on_commit(key, using):
+    # Dropping the entry before the commit would let a concurrent read cache
+    # the old figures again
+    transaction.on_commit(lambda: stats.invalidate(key), using=using)
+
+
+@receiver([post_save, post_delete], sender=BloodDonation)
+def invalidate_donation_stats(sender, using, **kwargs):
+    _invalidate_on_commit(stats.DONATION_STATS_KEY, using)
+
+
+@receiver([post_save, post_delete], sender=BloodRequest)
+def invalidate_request_stats(sender, using, **kwargs):
+    _invalidate_on_commit(stats.REQUEST_STATS_KEY, using)
+
+
+@receiver([post_save, post_delete], sender=BloodInventory)
+def invalidate_inventory(sender, using, **kwargs):
+    _invalidate_on_commit(stats.INVENTORY_KEY, using)
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_user_stats(sender, using, update_fields=None, **kwargs):
+    # Logins save last_login only; those can't change the donor/recipient counts
+    if update_fields and 'user_type' not in update_fields:
+        return
+    _invalidate_on_commit(stats.USER_STATS_KEY, using)
+
+
+# Per-user counters (UserStats)
+
+COUNTED_MODELS = [BloodDonation, BloodRequest, Appointment]
+
+
+@receiver(pre_save)
+def remember_counted_fields(sender, instance, **kwargs):
+    if sender not in COUNTED_MODELS:
+        return
+    instance._stats_old = None
+    if not instance._state.adding and instance.pk:
+        instance._stats_old = (
+            sender.objects.filter(pk=instance.pk)
+            .values(*counters.TRACKED_FIELDS[sender]).first()
+        )
+
+
+@receiver(post_save)
+def update_user_stats(sender, instance, **kwargs):
+    if sender not in COUNTED_MODELS:
+        return
+    old = getattr(instance, '_stats_old', None)
+    new = counters.snapshot(instance)
+    if old == new:
+        return
+    counters.apply_change(sender, old=old, new=new)
+
+
+@receiver(post_delete)
+def discount_user_stats(sender, instance, **kwargs):
+    if sender not in COUNTED_MODELS:
+        return
+    counters.apply_change(sender, old=counters.snapshot(instance))
+
+
+# Appointment slot places (AppointmentSlot.booked)
+
+# Saves claim or free places in Appointment.save(); deletes, including
+# cascades from a user, only ever free one
+
+@receiver(post_delete, sender=Appointment)
+def free_slot_place(sender, instance, **kwargs):
+    scheduling.move_place(old=counters.snapshot(instance))
+
+
+# Information Center full-text index
+
+@receiver(post_save, sender=InformationPost)
+def index_information_post(sender, instance, **kwargs):
+    search.index_post(instance)
+
+
+@receiver(post_delete, sender=InformationPost)
+def unindex_information_post(sender, instance, **kwargs):
+    search.remove_post(instance.pk)
@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from accounts.models import CustomUser
+from .models import BloodDonation, BloodRequest, BloodInventory
+
+
+# One cache entry per source table so a write only drops the figures it affects
+# Entries are dropped when a write commits; the timeout only bounds how long
+# figures can stay stale if an invalidation is ever missed
+STATS_TIMEOUT = 60 * 15
+
+DONATION_STATS_KEY = 'bloodapp:stats:donations'
+REQUEST_STATS_KEY = 'bloodapp:stats:requests'
+USER_STATS_KEY = 'bloodapp:stats:users'
+INVENTORY_KEY = 'bloodapp:stats:inventory'
+
+
+def _donation_stats():
+    return {'total_donations': BloodDonation.objects.count()}
+
+
+def _request_stats():
+    return BloodRequest.objects.aggregate(
+        total_requests=Count('id'),
+        fulfilled_requests_total=Count('id', filter=Q(is_fulfilled=True)),
+    )
+
+
+def _user_stats():
+    return CustomUser.objects.aggregate(
+        active_donors=Count('id', filter=Q(user_type='donor')),
+        active_recipients=Count('id', filter=Q(user_type='recipient')),
+    )
+
+
+def get_impact_stats():
+    """Site-wide counters shown on the home page, served from the cache."""
+    stats = {}
+    for key, compute in (
+        (DONATION_STATS_KEY, _donation_stats),
+        (REQUEST_STATS_KEY, _request_stats),
+        (USER_STATS_KEY, _user_stats),
+    ):
+        stats.update(cache.get_or_set(key, compute, STATS_TIMEOUT))
+    return stats
+
+
+def get_inventory():
+    return cache.get_or_set(INVENTORY_KEY, lambda: list(BloodInventory.objects.all()), STATS_TIMEOUT)
+
+
+def invalidate(*keys):
+    cache.delete_many(keys)
@@ -0,0 +1,246 @@
+import random
+from datetime import timedelta
+from functools import lru_cache
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from chat.models import ChatRoom, Message
+from . import counters, ledger, search, stats
+from .matching import COMPATIBLE_DONORS
+from .models import (
+    Appointment, AppointmentSlot, BloodDonation, BloodInventory, BloodRequest, InformationPost,
+)
+
+
+# Default population for generate_data; every count can be overridden
+DEFAULT_COUNTS = {
+    'donors': 1000,
+    'recipients': 200,
+    'doctors': 10,
+    'admins': 2,
+    'donations': 20000,
+    'requests': 5000,
+    'appointments': 10000,
+    'posts': 200,
+    'rooms': 500,
+    'messages': 50000,
+}
+
+BLOOD_GROUPS = list(COMPATIBLE_DONORS)
+CITIES = ['Accra', 'Kumasi', 'Tamale', 'Takoradi', 'Cape Coast', 'Sunyani', 'Ho', 'Koforidua']
+FIRST_NAMES = ['Ama', 'Kofi', 'Akosua', 'Kwame', 'Abena', 'Yaw', 'Efua', 'Kojo', 'Adwoa', 'Kwesi']
+LAST_NAMES = ['Mensah', 'Owusu', 'Boateng', 'Asante', 'Osei', 'Addo', 'Appiah', 'Darko']
+TOPICS = ['eligibility', 'iron', 'hydration', 'platelets', 'plasma', 'recovery', 'travel', 'screening']
+USER_TYPES = ('donors', 'donor'), ('recipients', 'recipient'), ('doctors', 'doctor'), ('admins', 'admin')
+
+
+@lru_cache
+def _password_hash(password):
+    # Hashing is deliberately slow; every generated user shares one hash
+    return make_password(password)
+
+
+class Generator:
+    """
+    Bulk-creates synthetic data for generate_data and the test suites'
+    seed_volume(). Usernames start with ``prefix`` so a run can sit next to
+    real data, and ``seed`` makes runs repeatable. Users get ``password``,
+    or an unusable one by default.
+
+    bulk_create sends no signals: callers rebuild UserStats (run() and
+    seed_volume() do) once everything is in.
+    """
+
+    def __init__(self, prefix='synth', seed=0, batch_size=1000, days=365, password=None):
+        self.prefix = prefix
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.days = days
+        self.password = _password_hash(password)
+        self.now = timezone.now()
+
+    def when(self, past=True):
+        offset = timedelta(minutes=self.rng.randrange(self.days * 24 * 60))
+        return self.now - offset if past else self.now + offset / 12
+
+    def _person(self, **fields):
+        fields.setdefault('first_name', self.rng.choice(FIRST_NAMES))
+        fields.setdefault('last_name', self.rng.choice(LAST_NAMES))
+        fields.setdefault('phone_number', f'{self.rng.randrange(10**9):09d}')
+        fields.setdefault('blood_group', self.rng.choice(BLOOD_GROUPS))
+        fields.setdefault('city', self.rng.choice(CITIES))
+        return CustomUser(password=self.password, **fields)
+
+    def user(self, username, user_type='donor', **fields):
+        """One named user, saved normally."""
+        user = self._person(username=username, user_type=user_type, **fields)
+        user.save()
+        return user
+
+    def users(self, user_type, count, **fields):
+        """``count`` users named <prefix>_<user_type>_<n>, in id order."""
+        fields.setdefault('is_staff', user_type == 'admin')
+        CustomUser.objects.bulk_create([
+            self._person(
+                username=f'{self.prefix}_{user_type}_{i}',
+                user_type=user_type,
+                email=f'{self.prefix}_{user_type}_{i}@example.com',
+                is_verified=self.rng.random() < 0.6,
+                **fields,
+            )
+            for i in range(count)
+        ], batch_size=self.batch_size)
+        # SQLite doesn't return bulk-inserted ids on every version; reload them
+        return list(CustomUser.objects.filter(username__startswith=f'{self.prefix}_{user_type}_').order_by('id'))
+
+    def donations(self, donors, count):
+        BloodDonation.objects.bulk_create((
+            BloodDonation(
+                donor=donor,
+                donation_date=self.when(),
+                blood_group=donor.blood_group,
+                quantity_ml=self.rng.choice([450, 450, 450, 500]),
+                hemoglobin_level=round(self.rng.uniform(12.0, 17.0), 1),
+                blood_pressure=f'{self.rng.randint(105, 135)}/{self.rng.randint(65, 88)}',
+                is_processed=self.rng.random() < 0.8,
+            )
+            for donor in (self.rng.choice(donors) for _ in range(count))
+        ), batch_size=self.batch_size)
+
+    def requests(self, recipients, count):
+        urgencies = [value for value, _ in BloodRequest.URGENCY_CHOICES]
+        rows = []
+        for _ in range(count):
+            urgency = self.rng.choice(urgencies)
+            rows.append(BloodRequest(
+                recipient=self.rng.choice(recipients),
+                blood_group=self.rng.choice(BLOOD_GROUPS),
+                units_required=self.rng.randint(1, 6),
+                urgency=urgency,
+                urgency_rank=BloodRequest.rank_for(urgency),
+                hospital_name=f'{self.rng.choice(CITIES)} General Hospital',
+                hospital_address=f'{self.rng.randint(1, 200)} Hospital Road',
+                required_date=self.when(past=self.rng.random() < 0.7).date(),
+                is_fulfilled=self.rng.random() < 0.6,
+                patient_name=f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}',
+                patient_age=self.rng.randint(1, 90),
+                medical_condition=self.rng.choice(['Surgery', 'Anaemia', 'Trauma', 'Childbirth']),
+            ))
+        BloodRequest.objects.bulk_create(rows, batch_size=self.batch_size)
+
+    def appointments(self, users, count):
+        types = [value for value, _ in AppointmentSlot.TYPE_CHOICES]
+        statuses = [value for value, _ in Appointment.STATUS_CHOICES]
+        Appointment.objects.bulk_create((
+            Appointment(
+                user=self.rng.choice(users),
+                appointment_type=self.rng.choice(types),
+                scheduled_date=self.when(past=self.rng.random() < 0.8),
+                status=self.rng.choice(statuses),
+            )
+            for _ in range(count)
+        ), batch_size=self.batch_size)
+
+    def slots(self, days=14, capacity=40):
+        """Bookable capacity for every type over the coming ``days``; existing slots are kept."""
+        today = timezone.localdate()
+        AppointmentSlot.objects.bulk_create([
+            AppointmentSlot(date=today + timedelta(days=day), appointment_type=kind, capacity=capacity)
+            for day in range(days) for kind, _ in AppointmentSlot.TYPE_CHOICES
+        ], ignore_conflicts=True)
+
+    def posts(self, authors, count):
+        """``count`` posts, added to the full-text index; returned in id order."""
+        categories = [value for value, _ in InformationPost.CATEGORY_CHOICES]
+        last_id = InformationPost.objects.aggregate(last=Max('id'))['last'] or 0
+        InformationPost.objects.bulk_create([
+            InformationPost(
+                title=f'{topic.title()} and blood donation ({i})',
+                content=' '.join(self.rng.choice(TOPICS + ['donors', 'blood', 'health', 'clinic'])
+                                 for _ in range(120)),
+                author=self.rng.choice(authors),
+                category=self.rng.choice(categories),
+                is_published=self.rng.random() < 0.9,
+                is_featured=self.rng.random() < 0.1,
+            )
+            for i, topic in ((i, self.rng.choice(TOPICS)) for i in range(count))
+        ], batch_size=self.batch_size)
+        posts = list(InformationPost.objects.filter(id__gt=last_id).select_related('author').order_by('id'))
+        # bulk_create skips the full-text index signal
+        for post in posts:
+            search.index_post(post)
+        return posts
+
+    def rooms(self, pairs, messages=0, unread=0):
+        """
+        A 1:1 room for each (user, other) pair with ``messages`` messages
+        alternating between the two, the last ``unread`` of them unread.
+        Returns the rooms in pair order.
+        """
+        pairs = [sorted(pair, key=lambda u: u.pk) for pair in pairs]
+        names = [f'Chat_{low.pk}_{high.pk}' for low, high in pairs]
+        ChatRoom.objects.bulk_create([
+            ChatRoom(name=name, user_low=low, user_high=high) for name, (low, high) in zip(names, pairs)
+        ], batch_size=self.batch_size, ignore_conflicts=True)
+        by_name = ChatRoom.objects.in_bulk(names, field_name='name')
+        rooms = [by_name[name] for name in names]
+
+        through = ChatRoom.participants.through
+        through.objects.bulk_create([
+            through(chatroom_id=room.pk, customuser_id=user.pk)
+            for room, pair in zip(rooms, pairs) for user in pair
+        ], batch_size=self.batch_size, ignore_conflicts=True)
+        Message.objects.bulk_create((
+            Message(room=room, sender=pair[i % 2], is_read=i < messages - unread,
+                    content=f'Message {i} about {self.rng.choice(TOPICS)}')
+            for room, pair in zip(rooms, pairs) for i in range(messages)
+        ), batch_size=self.batch_size)
+        return rooms
+
+    def room(self, user, other, messages=0, unread=0):
+        return self.rooms([(user, other)], messages, unread)[0]
+
+    def inventory(self, units=(5, 60)):
+        # Opening stock goes through the ledger so replay() still balances
+        for group in BLOOD_GROUPS:
+            if not BloodInventory.objects.filter(blood_group=group).exists():
+                ledger.record(group, self.rng.randint(*units), 'adjustment', note='Synthetic opening stock')
+
+    def run(self, counts, log=lambda message: None):
+        if CustomUser.objects.filter(username__startswith=f'{self.prefix}_').exists():
+            raise ValueError(f'Users prefixed "{self.prefix}_" already exist; pick another prefix.')
+        with transaction.atomic():
+            users = {user_type: self.users(user_type, counts[key]) for key, user_type in USER_TYPES}
+            log(f'{sum(len(group) for group in users.values())} users')
+            donors, recipients = users['donor'], users['recipient']
+            staff = users['doctor'] + users['admin']
+            if donors:
+                self.donations(donors, counts['donations'])
+                self.appointments(donors, counts['appointments'])
+                self.slots()
+                log(f'{counts["donations"]} donations, {counts["appointments"]} appointments')
+            if recipients:
+                self.requests(recipients, counts['requests'])
+                log(f'{counts["requests"]} requests')
+            if staff:
+                self.posts(staff, counts['posts'])
+                log(f'{counts["posts"]} posts')
+
+            everyone = donors + recipients + staff
+            pairs = set()
+            while len(pairs) < min(counts['rooms'], len(everyone) * (len(everyone) - 1) // 2):
+                pairs.add(tuple(sorted(self.rng.sample(everyone, 2), key=lambda u: u.pk)))
+            if pairs:
+                per_room = counts['messages'] // len(pairs)
+                self.rooms(sorted(pairs, key=lambda pair: (pair[0].pk, pair[1].pk)), per_room, per_room // 10)
+                log(f'{len(pairs)} rooms, {per_room * len(pairs)} messages')
+            self.inventory()
+
+            # bulk_create sent no signals, so bring the derived data up to date
+            counters.rebuild()
+            transaction.on_commit(lambda: stats.invalidate(
+                stats.DONATION_STATS_KEY, stats.REQUEST_STATS_KEY, stats.USER_STATS_KEY, stats.INVENTORY_KEY))
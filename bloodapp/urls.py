@@ -8,7 +8,10 @@ urlpatterns = [
     path('recipient/history/', views.recipient_history, name='recipient_history'),
     path('request-blood/', views.request_blood, name='request_blood'),
     path('request-appointment/', views.request_appointment, name='request_appointment'),
+    path('appointments/availability/', views.appointment_availability, name='appointment_availability'),
     path('doctor/dashboard/', views.doctor_dashboard, name='doctor_dashboard'),
+    path('doctor/requests/queue/', views.request_queue, name='request_queue'),
+    path('doctor/dashboard/<str:panel>/', views.doctor_dashboard_panel, name='doctor_dashboard_panel'),
     path('information/', views.information_center, name='information_center'),
     path('information/new/', views.information_create, name='information_create'),
     path('information/<int:pk>/', views.information_detail, name='information_detail'),
@@ -16,6 +19,13 @@ urlpatterns = [
     path('information/<int:pk>/delete/', views.information_delete, name='information_delete'),
     path('doctor/donation/<int:donation_id>/process/', views.process_donation, name='process_donation'),
     path('doctor/request/<int:request_id>/fulfill/', views.fulfill_request, name='fulfill_request'),
+    path('doctor/request/<int:request_id>/matches/', views.request_matches, name='request_matches'),
+    path('doctor/donations/process/', views.bulk_process_donations, name='bulk_process_donations'),
+    path('doctor/requests/fulfill/', views.bulk_fulfill_requests, name='bulk_fulfill_requests'),
+    path('doctor/appointments/status/', views.bulk_update_appointments, name='bulk_update_appointments'),
+    path('doctor/agenda/', views.appointment_agenda, name='appointment_agenda'),
+    path('doctor/agenda.ics', views.appointment_agenda_ical, name='appointment_agenda_ical'),
+    path('doctor/export/<str:kind>/', views.export_csv, name='export_csv'),
     path('doctor/appointment/<int:appointment_id>/<str:status>/', views.update_appointment_status, name='update_appointment_status'),
 
 ]
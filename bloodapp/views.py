@@ -1,45 +1,47 @@
+from datetime import timedelta
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Count, Q
+from django.db.models import Avg, Count, Max, Min, Q, Sum
 from .models import *
 from accounts.models import CustomUser
 from django.core.paginator import Paginator
-from datetime import timedelta
 from .models import BloodRequest
 from django.utils.dateparse import parse_date
 from .forms import InformationPostForm
 from django.utils import timezone
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.db import transaction
 from .models import InformationPost
+from .pagination import keyset_page
+from .stats import get_impact_stats, get_inventory
+from . import agenda, bulk, export, ledger, matching, scheduling, search
 
 
 
 def home(request):
     # Base context
-    blood_inventory = BloodInventory.objects.all()
+    blood_inventory = get_inventory()
     recent_posts = InformationPost.objects.filter(is_published=True).order_by('-created_at')[:3]
 
     # Inventory safety checks
     critical_groups = [inv for inv in blood_inventory if getattr(inv, 'is_critical', False)]
     has_critical = len(critical_groups) > 0
 
-    # Impact stats (adjust model names if different in your project)
-    total_donations = BloodDonation.objects.count()
-    total_requests = BloodRequest.objects.count()
-    fulfilled_requests_total = BloodRequest.objects.filter(is_fulfilled=True).count()
-    active_donors = CustomUser.objects.filter(user_type='donor').count()
-    active_recipients = CustomUser.objects.filter(user_type='recipient').count()
+    # Impact stats, cached and invalidated by bloodapp.signals
+    impact = get_impact_stats()
 
     context = {
         'blood_inventory': blood_inventory,
         'recent_posts': recent_posts,
         'has_critical': has_critical,
         'critical_groups': critical_groups,
-        'total_donations': total_donations,
-        'total_requests': total_requests,
-        'fulfilled_requests_total': fulfilled_requests_total,
-        'active_donors': active_donors,
-        'active_recipients': active_recipients,
+        'total_donations': impact['total_donations'],
+        'total_requests': impact['total_requests'],
+        'fulfilled_requests_total': impact['fulfilled_requests_total'],
+        'active_donors': impact['active_donors'],
+        'active_recipients': impact['active_recipients'],
     }
 
     # Personalization
@@ -47,13 +49,14 @@ def home(request):
         user = request.user
 
         if user.user_type == 'donor':
-            context['donation_count'] = BloodDonation.objects.filter(donor=user).count()
-            last_donation = BloodDonation.objects.filter(donor=user).order_by('-donation_date').first()
-            context['last_donation'] = last_donation.donation_date if last_donation else None
+            stats = UserStats.for_user(user)
+            context['donation_count'] = stats.donation_count
+            context['last_donation'] = stats.last_donation_date
 
         elif user.user_type == 'recipient':
-            context['request_count'] = BloodRequest.objects.filter(recipient=user).count()
-            context['fulfilled_requests'] = BloodRequest.objects.filter(recipient=user, is_fulfilled=True).count()
+            stats = UserStats.for_user(user)
+            context['request_count'] = stats.request_count
+            context['fulfilled_requests'] = stats.fulfilled_request_count
 
         elif user.user_type in ['doctor', 'admin']:
             # Simple role flags for hero and quick actions
@@ -65,14 +68,26 @@ def home(request):
 @login_required
 def donation_history(request):
     donations = BloodDonation.objects.filter(donor=request.user).order_by('-donation_date')
-    total_ml = sum(d.quantity_ml for d in donations)
-    last_donation = donations.first()
-    next_eligible = last_donation.donation_date + timedelta(days=56) if last_donation else None
+    summary = donations.aggregate(
+        donation_count=Count('id'),
+        total_ml=Sum('quantity_ml'),
+        first_donation=Min('donation_date'),
+        last_donation=Max('donation_date'),
+        avg_hemoglobin=Avg('hemoglobin_level'),
+    )
+
+    paginator = Paginator(donations, 10)
+    paginator.count = summary['donation_count']  # already counted above
+    page_obj = paginator.get_page(request.GET.get('page'))
 
     return render(request, 'bloodapp/donation_history.html', {
-        'donations': donations,
-        'total_ml': total_ml,
-        'next_eligible': next_eligible,
+        'donations': page_obj,
+        'donation_count': summary['donation_count'],
+        'first_donation': summary['first_donation'],
+        'last_donation': summary['last_donation'],
+        'total_ml': summary['total_ml'] or 0,
+        'avg_hemoglobin': summary['avg_hemoglobin'],
+        'next_eligible': UserStats.for_user(request.user).next_eligible_date,
     })
 
 @login_required
@@ -83,19 +98,15 @@ def donor_appointments(request):
 
     appointments = Appointment.objects.filter(user=request.user).order_by('-scheduled_date')
 
-    total_count = appointments.count()
-    confirmed_count = appointments.filter(status='confirmed').count()
-    completed_count = appointments.filter(status='completed').count()
-    pending_count = appointments.filter(status='pending').count()
-    cancelled_count = appointments.filter(status='cancelled').count()
+    stats = UserStats.for_user(request.user)
 
     return render(request, 'bloodapp/donor_appointments.html', {
         'appointments': appointments,
-        'total_count': total_count,
-        'confirmed_count': confirmed_count,
-        'completed_count': completed_count,
-        'pending_count': pending_count,
-        'cancelled_count': cancelled_count,
+        'total_count': stats.appointment_count,
+        'confirmed_count': stats.confirmed_appointments,
+        'completed_count': stats.completed_appointments,
+        'pending_count': stats.pending_appointments,
+        'cancelled_count': stats.cancelled_appointments,
     })
 
 
@@ -106,13 +117,13 @@ def recipient_history(request):
         return redirect('home')
 
     requests = BloodRequest.objects.filter(recipient=request.user).order_by('-required_date')
-    fulfilled_count = requests.filter(is_fulfilled=True).count()
-    pending_count = requests.filter(is_fulfilled=False).count()
+    stats = UserStats.for_user(request.user)
 
     return render(request, 'bloodapp/recipient_history.html', {
         'requests': requests,
-        'fulfilled_count': fulfilled_count,
-        'pending_count': pending_count,
+        'total_count': stats.request_count,
+        'fulfilled_count': stats.fulfilled_request_count,
+        'pending_count': stats.pending_request_count,
     })
 
 
@@ -185,30 +196,47 @@ def request_appointment(request):
             messages.error(request, 'Please fill in all required fields.')
             return redirect('request_appointment')
 
+        from django.utils.dateparse import parse_datetime
+        scheduled_dt = parse_datetime(scheduled_date)
+        if scheduled_dt is None:
+            messages.error(request, 'Invalid date format. Please use YYYY-MM-DD HH:MM.')
+            return redirect('request_appointment')
+        if timezone.is_naive(scheduled_dt):
+            scheduled_dt = timezone.make_aware(scheduled_dt)
+
+        # Claims a place in the day's slot; fails instead of overbooking
         try:
-          
-            from django.utils.dateparse import parse_datetime
-            scheduled_dt = parse_datetime(scheduled_date)
-            if scheduled_dt is None:
-                messages.error(request, 'Invalid date format. Please use YYYY-MM-DD HH:MM.')
-                return redirect('request_appointment')
-
-        
-            Appointment.objects.create(
-                user=request.user,
-                appointment_type=appointment_type,
-                scheduled_date=scheduled_dt,
-                notes=notes
-            )
+            scheduling.book(request.user, appointment_type, scheduled_dt, notes)
+        except scheduling.SlotUnavailable as e:
+            messages.error(request, str(e))
+            return redirect('request_appointment')
 
-            messages.success(request, 'Your appointment request has been submitted!')
-            return redirect('home')
+        messages.success(request, 'Your appointment request has been submitted!')
+        return redirect('home')
+
+    return render(request, 'bloodapp/request_appointment.html', {
+        'appointment_types': AppointmentSlot.TYPE_CHOICES,
+    })
 
-        except Exception as e:
-            messages.error(request, f'Error creating appointment: {e}')
-            return redirect('request_appointment')
 
-    return render(request, 'bloodapp/request_appointment.html')
+@login_required
+def appointment_availability(request):
+    """Open slots per day and type in [from, to) as JSON (default: the next two weeks)."""
+    today = timezone.localdate()
+    start = parse_date(request.GET.get('from', '')) or today
+    end = parse_date(request.GET.get('to', '')) or start + timedelta(days=14)
+    end = min(end, start + timedelta(days=scheduling.MAX_AVAILABILITY_DAYS))
+
+    slots = scheduling.availability(max(start, today), end, request.GET.get('type'))
+    return JsonResponse({'slots': [
+        {
+            'date': slot.date,
+            'appointment_type': slot.appointment_type,
+            'capacity': slot.capacity,
+            'available': slot.available,
+        }
+        for slot in slots
+    ]})
 
 
 
@@ -223,22 +251,27 @@ def profile(request):
 
 
 def information_center(request):
-    posts = InformationPost.objects.filter(is_published=True).order_by('-created_at')
+    posts = InformationPost.objects.filter(is_published=True).select_related('author').order_by('-created_at')
     
-    # Get search query
-    search_query = request.GET.get('q', '')
-    if search_query:
-        posts = posts.filter(
-            Q(title__icontains=search_query) |
-            Q(content__icontains=search_query) |
-            Q(author__username__icontains=search_query)
-        )
-    
-    # Filter by category
+    # Filter by category (before searching: ranked results are no longer a queryset)
     category = request.GET.get('category', '')
    
     if category:
         posts = posts.filter(category=category)
+
+    # Get search query
+    search_query = request.GET.get('q', '')
+    ranked = False
+    if search_query:
+        matches = search.search_posts(posts, search_query) if search.is_available() else None
+        if matches is not None:
+            posts, ranked = matches, True
+        else:
+            posts = posts.filter(
+                Q(title__icontains=search_query) |
+                Q(content__icontains=search_query) |
+                Q(author__username__icontains=search_query)
+            )
     
      # Aggregate categories with counts
     raw_categories = (
@@ -264,10 +297,15 @@ def information_center(request):
     paginator = Paginator(posts, 6)  # Show 6 posts per page
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    if ranked:
+        for post in page_obj:
+            post.highlighted_snippet = search.highlight(post.search_snippet)
     featured_posts = InformationPost.objects.filter(is_published=True, is_featured=True).order_by('-created_at')[:3]
 
     return render(request, 'bloodapp/information_centre.html', {
         'posts': page_obj,
+        # Elided so a broad search doesn't render a link per page
+        'page_range': paginator.get_elided_page_range(page_obj.number, on_each_side=2, on_ends=1),
         'categories': categories,
         'active_category': category,
         'search_query': search_query,
@@ -341,44 +379,118 @@ def information_detail(request, pk):
 
 
 
+# Doctor dashboard panels: (queryset, keyset field, row template)
+DASHBOARD_PANELS = {
+    'donations': (
+        lambda: BloodDonation.objects.select_related('donor'),
+        'donation_date',
+        'bloodapp/partials/donation_rows.html',
+    ),
+    'requests': (
+        lambda: BloodRequest.objects.select_related('recipient'),
+        'required_date',
+        'bloodapp/partials/request_rows.html',
+    ),
+    'appointments': (
+        lambda: Appointment.objects.select_related('user'),
+        'scheduled_date',
+        'bloodapp/partials/appointment_rows.html',
+    ),
+}
+
+
+# Open requests shown on the dashboard / returned by the queue API
+PRIORITY_QUEUE_SIZE = 10
+PRIORITY_QUEUE_MAX = 100
+
+
+def _dashboard_panel_page(panel, cursor=None):
+    queryset, field, template = DASHBOARD_PANELS[panel]
+    rows, next_cursor = keyset_page(queryset(), field, cursor)
+    return template, {'rows': rows, 'panel': panel, 'next_cursor': next_cursor}
+
+
 @login_required
 def doctor_dashboard(request):
     if request.user.user_type != 'doctor':
         messages.error(request, 'Only doctors can access the doctor dashboard.')
         return redirect('home')
 
-    donations = BloodDonation.objects.all().order_by('-donation_date')
-    requests = BloodRequest.objects.all().order_by('-required_date')
-    appointments = Appointment.objects.all().order_by('-scheduled_date')
     inventory = BloodInventory.objects.all()
 
     # Summary counts
-    donation_count = donations.count()
-    request_count = requests.count()
-    appointment_count = appointments.count()
+    donation_count = BloodDonation.objects.count()
+    request_breakdown = BloodRequest.objects.status_breakdown()
+    appointment_breakdown = Appointment.objects.status_breakdown()
     critical_inventory = inventory.filter(available_units__lte=models.F('critical_level')).count()
 
+    # Only the first page of each panel is rendered here; the rest is
+    # fetched from doctor_dashboard_panel as the doctor scrolls.
+    panels = {}
+    for panel in DASHBOARD_PANELS:
+        _, panels[panel] = _dashboard_panel_page(panel)
+    priority_queue = BloodRequest.objects.open_queue().select_related('recipient')[:PRIORITY_QUEUE_SIZE]
+
     return render(request, 'bloodapp/doctor_dashboard.html', {
-        'donations': donations,       
-        'requests': requests,         
-        'appointments': appointments, 
+        'donations': panels['donations'],
+        'requests': panels['requests'],
+        'appointments': panels['appointments'],
+        'priority_queue': priority_queue,
         'inventory': inventory,
         'donation_count': donation_count,
-        'request_count': request_count,
-        'appointment_count': appointment_count,
+        'request_count': request_breakdown['total'],
+        'appointment_count': appointment_breakdown['total'],
+        'request_breakdown': request_breakdown,
+        'appointment_breakdown': appointment_breakdown,
         'critical_inventory': critical_inventory,
     })
 
+
+@login_required
+def doctor_dashboard_panel(request, panel):
+    if request.user.user_type != 'doctor':
+        return HttpResponseForbidden('Only doctors can access the doctor dashboard.')
+    if panel not in DASHBOARD_PANELS:
+        raise Http404('Unknown dashboard panel.')
+
+    template, context = _dashboard_panel_page(panel, request.GET.get('cursor'))
+    return render(request, template, context)
+
+
+@login_required
+def request_queue(request):
+    """Top open requests by urgency, then required date, as JSON."""
+    if request.user.user_type != 'doctor':
+        return HttpResponseForbidden('Only doctors can view the request queue.')
+
+    try:
+        limit = int(request.GET.get('limit', PRIORITY_QUEUE_SIZE))
+    except ValueError:
+        limit = PRIORITY_QUEUE_SIZE
+    limit = max(1, min(limit, PRIORITY_QUEUE_MAX))
+
+    queue = BloodRequest.objects.open_queue().values(
+        'id', 'patient_name', 'blood_group', 'units_required', 'urgency',
+        'urgency_rank', 'required_date', 'hospital_name', 'recipient__username',
+    )[:limit]
+    return JsonResponse({'requests': list(queue)})
+
 @login_required
 def process_donation(request, donation_id):
     if request.user.user_type != 'doctor':
         messages.error(request, 'Only doctors can process donations.')
         return redirect('home')
 
-    donation = get_object_or_404(BloodDonation, id=donation_id)
-    donation.is_processed = True
-    donation.processed_date = timezone.now()
-    donation.save()
+    with transaction.atomic():
+        donation = get_object_or_404(BloodDonation.objects.select_for_update(), id=donation_id)
+        if donation.is_processed:
+            messages.info(request, 'Donation was already processed.')
+            return redirect('doctor_dashboard')
+        donation.is_processed = True
+        donation.processed_date = timezone.now()
+        donation.save()
+        ledger.record(donation.blood_group, ledger.units_for_donation(donation), 'donation',
+                      donation=donation, user=request.user)
     messages.success(request, 'Donation marked as processed.')
     return redirect('doctor_dashboard')
 
@@ -389,22 +501,187 @@ def fulfill_request(request, request_id):
         messages.error(request, 'Only doctors can fulfill requests.')
         return redirect('home')
 
-    req = get_object_or_404(BloodRequest, id=request_id)
-    req.is_fulfilled = True
-    req.fulfilled_date = timezone.now()
-    req.save()
+    try:
+        with transaction.atomic():
+            req = get_object_or_404(BloodRequest.objects.select_for_update(), id=request_id)
+            if req.is_fulfilled:
+                messages.info(request, 'Request was already fulfilled.')
+                return redirect('doctor_dashboard')
+            req.is_fulfilled = True
+            req.fulfilled_date = timezone.now()
+            req.save()
+            ledger.record(req.blood_group, -req.units_required, 'request',
+                          blood_request=req, user=request.user)
+    except ledger.InsufficientStock as e:
+        # Raised inside the block, so the request stays open
+        messages.error(request, str(e))
+        return redirect('doctor_dashboard')
     messages.success(request, 'Request marked as fulfilled.')
     return redirect('doctor_dashboard')
 
 
+def _posted_ids(request):
+    return [int(value) for value in request.POST.getlist('ids') if value.isdigit()]
+
+
+@login_required
+def bulk_process_donations(request):
+    if request.user.user_type != 'doctor':
+        messages.error(request, 'Only doctors can process donations.')
+        return redirect('home')
+    if request.method != 'POST':
+        return redirect('doctor_dashboard')
+
+    count = bulk.process_donations(_posted_ids(request), user=request.user)
+    messages.success(request, f'{count} donation(s) marked as processed.')
+    return redirect('doctor_dashboard')
+
+
+@login_required
+def bulk_fulfill_requests(request):
+    if request.user.user_type != 'doctor':
+        messages.error(request, 'Only doctors can fulfill requests.')
+        return redirect('home')
+    if request.method != 'POST':
+        return redirect('doctor_dashboard')
+
+    try:
+        count = bulk.fulfill_requests(_posted_ids(request), user=request.user)
+    except ledger.InsufficientStock as e:
+        messages.error(request, str(e))
+        return redirect('doctor_dashboard')
+    messages.success(request, f'{count} request(s) marked as fulfilled.')
+    return redirect('doctor_dashboard')
+
+
+@login_required
+def bulk_update_appointments(request):
+    if request.user.user_type != 'doctor':
+        messages.error(request, 'Only doctors can update appointments.')
+        return redirect('home')
+    if request.method != 'POST':
+        return redirect('doctor_dashboard')
+
+    status = request.POST.get('status')
+    if status not in dict(Appointment.STATUS_CHOICES):
+        messages.error(request, 'Invalid appointment status.')
+        return redirect('doctor_dashboard')
+
+    try:
+        count = bulk.update_appointments(_posted_ids(request), status)
+    except scheduling.SlotUnavailable as e:
+        messages.error(request, str(e))
+        return redirect('doctor_dashboard')
+    messages.success(request, f'{count} appointment(s) marked as {status}.')
+    return redirect('doctor_dashboard')
+
+
+@login_required
+def appointment_agenda(request):
+    """Appointments in a day/week (or [start, end)) window, grouped by day and status."""
+    if request.user.user_type != 'doctor':
+        return HttpResponseForbidden('Only doctors can view the agenda.')
+
+    try:
+        start, end = agenda.window(request.GET)
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    days = agenda.group_by_day(agenda.appointments_between(start, end), start, end)
+    return JsonResponse({
+        'start': start,
+        'end': end,
+        'days': [
+            {
+                'date': day['date'],
+                'counts': day['counts'],
+                'appointments': {
+                    status: [
+                        {
+                            'id': appt.id,
+                            'user': appt.user.username,
+                            'user_id': appt.user_id,
+                            'appointment_type': appt.appointment_type,
+                            'scheduled_date': appt.scheduled_date,
+                            'notes': appt.notes,
+                        }
+                        for appt in appts
+                    ]
+                    for status, appts in day['appointments'].items()
+                },
+            }
+            for day in days
+        ],
+    })
+
+
+@login_required
+def appointment_agenda_ical(request):
+    if request.user.user_type != 'doctor':
+        return HttpResponseForbidden('Only doctors can view the agenda.')
+
+    params = request.GET.copy()
+    params.setdefault('view', 'week')
+    try:
+        start, end = agenda.window(params)
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    response = HttpResponse(agenda.to_ical(agenda.appointments_between(start, end), request.get_host()),
+                            content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="appointments-{start:%Y%m%d}.ics"'
+    return response
+
+
+@login_required
+def export_csv(request, kind):
+    if request.user.user_type != 'doctor':
+        return HttpResponseForbidden('Only doctors can export records.')
+    if kind not in export.EXPORTS:
+        raise Http404('Unknown export.')
+
+    try:
+        queryset = export.export_queryset(kind, request.GET)
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    # Rows are written as they're read, so the response never sits in memory whole
+    response = StreamingHttpResponse(export.csv_chunks(kind, queryset), content_type='text/csv')
+    filename = f'{kind}-{timezone.localdate():%Y%m%d}.csv'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+def request_matches(request, request_id):
+    if request.user.user_type != 'doctor':
+        messages.error(request, 'Only doctors can match donors to requests.')
+        return redirect('home')
+
+    req = get_object_or_404(BloodRequest.objects.select_related('recipient'), id=request_id)
+    donors = matching.match_donors(req)
+
+    return render(request, 'bloodapp/request_matches.html', {
+        'req': req,
+        'donors': donors,
+        'compatible_groups': matching.COMPATIBLE_DONORS.get(matching.normalize_group(req.blood_group), ()),
+    })
+
+
 @login_required
 def update_appointment_status(request, appointment_id, status):
     if request.user.user_type != 'doctor':
         messages.error(request, 'Only doctors can update appointments.')
         return redirect('home')
 
-    appt = get_object_or_404(Appointment, id=appointment_id)
-    appt.status = status
-    appt.save()
+    try:
+        with transaction.atomic():
+            appt = get_object_or_404(Appointment.objects.select_for_update(), id=appointment_id)
+            # Saving frees or reclaims the slot place (bloodapp.signals)
+            appt.status = status
+            appt.save()
+    except scheduling.SlotUnavailable as e:
+        messages.error(request, str(e))
+        return redirect('doctor_dashboard')
     messages.success(request, f'Appointment marked as {status}.')
     return redirect('doctor_dashboard')
\ No newline at end of file
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import re
+from http.cookies import SimpleCookie
+from importlib import import_module
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.http.request import validate_host
+
+from .layers import get_channel_layer, room_group
+from .models import ChatRoom, Message
+
+
+ROOM_PATH = re.compile(r'^/ws/chat/(?P<room_id>\d+)/$')
+
+
+class _SessionRequest:
+    # Just enough of an HttpRequest for django.contrib.auth.get_user()
+    def __init__(self, session):
+        self.session = session
+
+
+def _origin_allowed(scope):
+    """
+    Whether the handshake's Origin header names one of ALLOWED_HOSTS, so
+    other sites can't open a socket with the user's session cookie. Under
+    DEBUG an empty ALLOWED_HOSTS means localhost, as for HttpRequest.get_host().
+    """
+    allowed = settings.ALLOWED_HOSTS
+    if settings.DEBUG and not allowed:
+        allowed = ['.localhost', '127.0.0.1', '[::1]']
+    origin = dict(scope.get('headers', [])).get(b'origin', b'').decode('latin1')
+    try:
+        host = urlsplit(origin).hostname
+    except ValueError:
+        return False
+    if host and ':' in host:
+        host = f'[{host}]'  # validate_host() matches IPv6 hosts in brackets
+    return bool(host) and validate_host(host, allowed)
+
+
+def _user_from_scope(scope):
+    cookies = SimpleCookie()
+    for name, value in scope.get('headers', []):
+        if name == b'cookie':
+            cookies.load(value.decode('latin1'))
+    session_key = cookies.get(settings.SESSION_COOKIE_NAME)
+    engine = import_module(settings.SESSION_ENGINE)
+    session = engine.SessionStore(session_key.value if session_key else None)
+    return get_user(_SessionRequest(session))
+
+
+def _room_for(user, room_id):
+    if not user.is_authenticated:
+        return None
+    return ChatRoom.objects.filter(id=room_id, participants=user).first()
+
+
+def _create_message(room, user, text):
+    # Saving fires chat.signals, which broadcasts to the room's sockets
+    Message.objects.create(room=room, sender=user, content=text)
+
+
+async def chat_socket(scope, receive, send):
+    """
+    ASGI WebSocket endpoint at /ws/chat/<room_id>/. Participants receive every
+    new Message in the room as JSON and may send {"message": "..."} frames.
+    """
+    event = await receive()
+    if event['type'] != 'websocket.connect':
+        return
+
+    if not _origin_allowed(scope):
+        await send({'type': 'websocket.close', 'code': 4403})
+        return
+
+    match = ROOM_PATH.match(scope['path'])
+    user = await sync_to_async(_user_from_scope)(scope)
+    room = await sync_to_async(_room_for)(user, match['room_id']) if match else None
+    if room is None:
+        await send({'type': 'websocket.close', 'code': 4403})
+        return
+
+    await send({'type': 'websocket.accept'})
+    layer = get_channel_layer()
+    group = room_group(room.id)
+    queue = asyncio.Queue()
+    await layer.group_add(group, queue)
+
+    async def forward():
+        while True:
+            payload = await queue.get()
+            await send({'type': 'websocket.send', 'text': json.dumps(payload)})
+
+    forwarder = asyncio.ensure_future(forward())
+    try:
+        while True:
+            event = await receive()
+            if event['type'] == 'websocket.disconnect':
+                break
+            if event['type'] != 'websocket.receive' or not event.get('text'):
+                continue
+            try:
+                text = str(json.loads(event['text']).get('message', '')).strip()
+            except (ValueError, AttributeError):
+                continue
+            if text:
+                await sync_to_async(_create_message)(room, user, text)
+    finally:
+        forwarder.cancel()
+        await layer.group_discard(group, queue)
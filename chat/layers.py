@@ -0,0 +1,110 @@
+import asyncio
+import json
+from collections import defaultdict
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+
+def room_group(room_id):
+    return f'chat_room_{room_id}'
+
+
+class InMemoryChannelLayer:
+    """
+    Fan-out of chat events to the sockets connected to this process. Each
+    socket registers an asyncio.Queue under its room's group name.
+    """
+
+    def __init__(self, **options):
+        self.groups = defaultdict(set)
+
+    async def group_add(self, group, queue):
+        self.groups[group].add(queue)
+
+    async def group_discard(self, group, queue):
+        queues = self.groups.get(group)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.groups[group]
+
+    async def group_send(self, group, message):
+        for queue in list(self.groups.get(group, ())):
+            queue.put_nowait(message)
+
+    def send(self, group, message):
+        """group_send() for sync code such as signal receivers."""
+        async_to_sync(self.group_send)(group, message)
+
+
+class RedisChannelLayer(InMemoryChannelLayer):
+    """
+    Routes group_send through Redis pub/sub so sockets held by other
+    processes (or a local Redis stand-in) see every message too.
+
+    The asyncio client belongs to the server's event loop, where the sockets
+    live. Sync callers publish through a separate blocking client: under
+    WSGI or in management commands each async_to_sync() call runs on a new
+    loop, which an asyncio client can't be shared across.
+    """
+
+    def __init__(self, url='redis://localhost:6379/0', prefix='crimsonbalance', **options):
+        super().__init__(**options)
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError:
+            raise ImproperlyConfigured('RedisChannelLayer requires the "redis" package.')
+        self.redis = redis.asyncio.from_url(url)
+        self.sync_redis = redis.from_url(url)
+        self.prefix = prefix
+        self.pubsub = None
+        self.listener = None
+
+    def channel_name(self, group):
+        return f'{self.prefix}:{group}'
+
+    async def group_add(self, group, queue):
+        await super().group_add(group, queue)
+        if self.pubsub is None:
+            self.pubsub = self.redis.pubsub()
+        await self.pubsub.subscribe(self.channel_name(group))
+        if self.listener is None:
+            self.listener = asyncio.ensure_future(self.listen())
+
+    async def group_discard(self, group, queue):
+        await super().group_discard(group, queue)
+        if group not in self.groups and self.pubsub is not None:
+            await self.pubsub.unsubscribe(self.channel_name(group))
+
+    async def group_send(self, group, message):
+        await self.redis.publish(self.channel_name(group), json.dumps(message))
+
+    def send(self, group, message):
+        self.sync_redis.publish(self.channel_name(group), json.dumps(message))
+
+    async def listen(self):
+        async for item in self.pubsub.listen():
+            if item['type'] != 'message':
+                continue
+            channel = item['channel']
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            group = channel[len(self.prefix) + 1:]
+            await super().group_send(group, json.loads(item['data']))
+
+
+_layer = None
+
+
+def get_channel_layer():
+    """Return the process-wide layer configured by settings.CHAT_CHANNEL_LAYER."""
+    global _layer
+    if _layer is None:
+        config = getattr(settings, 'CHAT_CHANNEL_LAYER', {})
+        backend = import_string(config.get('BACKEND', 'chat.layers.InMemoryChannelLayer'))
+        _layer = backend(**config.get('OPTIONS', {}))
+    return _layer
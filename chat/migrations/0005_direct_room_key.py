@@ -0,0 +1,51 @@
+# Generated by Django 6.0 on 2026-10-18 10:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_direct_rooms(apps, schema_editor):
+    # Key one existing room per participant pair. Prefer the canonically named
+    # room so new get-or-creates never collide with its unique name; any other
+    # duplicates stay unkeyed and remain reachable from the dashboard.
+    ChatRoom = apps.get_model('chat', 'ChatRoom')
+    rooms = ChatRoom.objects.filter(is_group=False).prefetch_related('participants').order_by('created_at')
+    candidates = {}
+    for room in rooms:
+        ids = sorted(p.id for p in room.participants.all())
+        if len(ids) != 2:
+            continue
+        pair = tuple(ids)
+        current = candidates.get(pair)
+        if current is None or (room.name == 'Chat_%d_%d' % pair and current.name != room.name):
+            candidates[pair] = room
+    for (low, high), room in candidates.items():
+        room.user_low_id, room.user_high_id = low, high
+        room.save(update_fields=['user_low', 'user_high'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_message_unread_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatroom',
+            name='user_high',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='user_low',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='chatroom',
+            constraint=models.UniqueConstraint(fields=('user_low', 'user_high'), name='unique_direct_room'),
+        ),
+        migrations.RunPython(backfill_direct_rooms, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,75 @@
-from django.db import models
+from django.db import models, transaction
 from accounts.models import CustomUser  # Use your project’s user model
 
+class ChatRoomQuerySet(models.QuerySet):
+    def with_summary(self, user):
+        """
+        Annotate each room with ``unread_count`` (messages from others that
+        ``user`` hasn't read) and the latest message's text, time and sender.
+        """
+        latest = Message.objects.filter(room=models.OuterRef('pk')).order_by('-id')
+        # A correlated count per room reads only that room's unread rows from
+        # message_unread_idx; a JOIN + COUNT would read every message
+        unread = (Message.objects
+                  .filter(room=models.OuterRef('pk'), is_read=False)
+                  .exclude(sender=user)
+                  .order_by().values('room')
+                  .annotate(count=models.Count('id')).values('count'))
+        return self.annotate(
+            unread_count=models.functions.Coalesce(
+                models.Subquery(unread, output_field=models.IntegerField()), 0),
+            last_message_text=models.Subquery(latest.values('content')[:1]),
+            last_message_at=models.Subquery(latest.values('timestamp')[:1]),
+            last_message_sender=models.Subquery(latest.values('sender__username')[:1]),
+        )
+
+
+    def get_or_create_direct(self, user, other):
+        """
+        Return (room, created) for the 1:1 room between two users. The room is
+        keyed by the ordered (user_low, user_high) pair, so the lookup is one
+        unique-index probe and concurrent creates collapse into one row.
+        """
+        low, high = sorted([user.pk, other.pk])
+        room = self.filter(user_low_id=low, user_high_id=high).first()
+        if room is not None:
+            return room, False
+        with transaction.atomic():
+            room, created = self.get_or_create(
+                user_low_id=low, user_high_id=high,
+                defaults={'name': f"Chat_{low}_{high}"},
+            )
+            if created:
+                room.participants.add(low, high)
+        return room, created
+
+
 class ChatRoom(models.Model):
     name = models.CharField(max_length=255, unique=True)
     participants = models.ManyToManyField(CustomUser)
     is_group = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Canonical participant pair for 1:1 rooms (user_low.id < user_high.id)
+    user_low = models.ForeignKey(CustomUser, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    user_high = models.ForeignKey(CustomUser, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+
+    objects = ChatRoomQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_low', 'user_high'], name='unique_direct_room'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def mark_read(self, user, up_to):
+        """Flag every message from others up to ``up_to`` as read in one UPDATE."""
+        return (self.messages
+                .filter(id__lte=up_to, is_read=False)
+                .exclude(sender=user)
+                .update(is_read=True))
+
 class Message(models.Model):
     room = models.ForeignKey(ChatRoom, on_delete=models.CASCADE, related_name='messages')
     sender = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='sent_messages')
@@ -19,6 +79,21 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['room', 'timestamp'], name='message_room_time_idx'),
+            models.Index(fields=['room', 'sender'], name='message_unread_idx',
+                         condition=models.Q(is_read=False)),
+        ]
 
     def __str__(self):
-        return f"{self.sender.username}: {self.content[:50]}"
\ No newline at end of file
+        return f"{self.sender.username}: {self.content[:50]}"
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'room': self.room_id,
+            'sender': self.sender.username,
+            'sender_id': self.sender_id,
+            'text': self.content,
+            'timestamp': self.timestamp.strftime('%H:%M'),
+        }
\ No newline at end of file
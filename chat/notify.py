@@ -0,0 +1,45 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+
+
+class MessageNotifier:
+    """
+    Wakes long-poll requests waiting on a room when a message is committed.
+    Waiters are asyncio events on the request's own loop, so a waiting poll
+    holds no thread. In-process only: waiters in other processes fall back
+    to their poll timeout.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = {}
+
+    def notify(self, room_id):
+        # Commit hooks run in whatever thread did the write
+        with self._lock:
+            waiters = list(self._waiters.get(room_id, ()))
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    @contextmanager
+    def listen(self, room_id):
+        """
+        Yield an asyncio.Event that is set when a message is committed to
+        ``room_id``. Must be entered on the running event loop.
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.setdefault(room_id, set()).add(waiter)
+        try:
+            yield waiter[1]
+        finally:
+            with self._lock:
+                waiters = self._waiters[room_id]
+                waiters.discard(waiter)
+                # Rooms nobody is waiting on take no memory
+                if not waiters:
+                    del self._waiters[room_id]
+
+
+notifier = MessageNotifier()
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .layers import get_channel_layer, room_group
+from .notify import notifier
+from .models import Message
+
+
+@receiver(post_save, sender=Message)
+def broadcast_message(sender, instance, created, **kwargs):
+    if not created:
+        return
+    payload = instance.to_dict()
+
+    def publish():
+        notifier.notify(instance.room_id)
+        get_channel_layer().send(room_group(instance.room_id), payload)
+
+    transaction.on_commit(publish)
@@ -1,3 +1,166 @@
+import asyncio
+import json
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
 from django.test import TestCase
 
-# Create your tests here.
+from bloodapp.synthetic import Generator
+from crimsonbalance.testing import QueryBudgetMixin, seed_volume
+from .consumers import chat_socket
+from .layers import RedisChannelLayer
+from .models import ChatRoom, Message
+from .notify import notifier
+
+
+class UnreadCountTests(TestCase):
+
+    def test_counts_only_others_unread_messages(self):
+        generator = Generator()
+        ama, kofi, yaw = generator.user('ama'), generator.user('kofi'), generator.user('yaw')
+        room = generator.room(ama, kofi, messages=30, unread=10)  # alternating senders
+        generator.room(kofi, yaw)
+        counts = dict(ChatRoom.objects.filter(participants=ama).with_summary(ama).values_list('pk', 'unread_count'))
+        self.assertEqual(counts, {room.pk: 5})
+        room.mark_read(ama, room.messages.order_by('-id')[0].pk)
+        self.assertEqual(ChatRoom.objects.with_summary(ama).get(pk=room.pk).unread_count, 0)
+        self.assertEqual(ChatRoom.objects.with_summary(yaw).exclude(pk=room.pk).get().unread_count, 0)
+
+
+class LongPollTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generator = Generator()
+        cls.ama, cls.kofi = generator.user('ama'), generator.user('kofi')
+        cls.room = generator.room(cls.ama, cls.kofi, messages=2)
+        cls.last_id = cls.room.messages.order_by('-id')[0].pk
+        cls.url = f'/chat/room/{cls.room.pk}/messages/since/{cls.last_id}/'
+
+    def test_wsgi_clients_are_told_to_come_back(self):
+        self.client.force_login(self.ama)
+        response = self.client.get(self.url)
+        self.assertEqual(response.json(), {'messages': [], 'last_id': self.last_id, 'retry_after': 3})
+
+    async def test_wakes_when_a_message_is_committed(self):
+        await self.async_client.aforce_login(self.ama)
+
+        async def send():
+            await asyncio.sleep(0.05)
+            message = await sync_to_async(Message.objects.create)(room=self.room, sender=self.kofi, content='Hi')
+            # The commit hook runs in the writing thread, not on the loop
+            threading.Thread(target=notifier.notify, args=[self.room.pk]).start()
+            return message
+
+        sending = asyncio.ensure_future(send())
+        response = await self.async_client.get(self.url)
+        message = await sending
+        self.assertEqual([msg['id'] for msg in response.json()['messages']], [message.pk])
+        self.assertEqual(notifier._waiters, {})
+
+    async def test_times_out_empty(self):
+        await self.async_client.aforce_login(self.ama)
+        with mock.patch('chat.views.LONG_POLL_TIMEOUT', 0.05):
+            response = await self.async_client.get(self.url)
+        self.assertEqual(response.json(), {'messages': [], 'last_id': self.last_id})
+        self.assertEqual(notifier._waiters, {})
+
+
+class ChatSocketTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generator = Generator()
+        cls.ama, cls.kofi = generator.user('ama'), generator.user('kofi')
+        cls.room = generator.room(cls.ama, cls.kofi)
+
+    def handshake(self, origin):
+        self.client.force_login(self.ama)
+        headers = [(b'cookie', f'sessionid={self.client.cookies["sessionid"].value}'.encode())]
+        if origin:
+            headers.append((b'origin', origin.encode()))
+        scope = {'type': 'websocket', 'path': f'/ws/chat/{self.room.pk}/', 'headers': headers}
+        events = iter([{'type': 'websocket.connect'}, {'type': 'websocket.disconnect', 'code': 1000}])
+        sent = []
+
+        async def receive():
+            return next(events)
+
+        async def send(message):
+            sent.append(message)
+
+        async_to_sync(chat_socket)(scope, receive, send)
+        return sent[0]
+
+    def test_same_origin_is_accepted(self):
+        self.assertEqual(self.handshake('http://testserver'), {'type': 'websocket.accept'})
+
+    def test_other_origins_are_rejected(self):
+        for origin in ('https://evil.example', 'null', None):
+            with self.subTest(origin=origin):
+                self.assertEqual(self.handshake(origin), {'type': 'websocket.close', 'code': 4403})
+
+
+class RedisLayerTests(TestCase):
+
+    def test_sync_publishes_use_the_blocking_client(self):
+        # redis isn't a dependency of the test suite; stand in for the module
+        redis = mock.MagicMock()
+        with mock.patch.dict('sys.modules', {'redis': redis, 'redis.asyncio': redis.asyncio}), \
+                mock.patch('chat.layers._layer', RedisChannelLayer(prefix='test')):
+            generator = Generator()
+            ama, kofi = generator.user('ama'), generator.user('kofi')
+            room = generator.room(ama, kofi)
+            with self.captureOnCommitCallbacks(execute=True):
+                Message.objects.create(room=room, sender=ama, content='One')
+            with self.captureOnCommitCallbacks(execute=True):
+                Message.objects.create(room=room, sender=kofi, content='Two')
+
+        publish = redis.from_url.return_value.publish
+        self.assertEqual([call.args[0] for call in publish.call_args_list], [f'test:chat_room_{room.pk}'] * 2)
+        self.assertEqual([json.loads(call.args[1])['text'] for call in publish.call_args_list], ['One', 'Two'])
+        redis.asyncio.from_url.return_value.publish.assert_not_called()
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Upper bounds on the queries each chat URL runs (see bloodapp.tests)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_volume()
+        cls.donor, cls.doctor, cls.room = cls.data['donor'], cls.data['doctor'], cls.data['room']
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.donor)
+        self.before = self.room.messages.order_by('-id').values_list('id', flat=True)[5]
+
+    def fetch(self, url, budget, method='get', data=None, status=200):
+        with self.assertMaxQueries(budget):
+            response = getattr(self.client, method)(url, data or {})
+        self.assertEqual(response.status_code, status, url)
+        return response
+
+    def test_dashboard(self):
+        self.fetch('/chat/dashboard/', 3)
+        self.fetch('/chat/users/search/?q=don', 3)
+
+    def test_room(self):
+        self.fetch(f'/chat/room/{self.room.pk}/', 7)
+        self.fetch(f'/chat/room/{self.room.pk}/history/?before={self.before}', 5)
+
+    def test_messages_since(self):
+        # Messages exist after ``before``, so the long poll answers at once
+        self.fetch(f'/chat/room/{self.room.pk}/messages/since/{self.before}/', 4)
+
+    def test_mark_read(self):
+        self.fetch(f'/chat/room/{self.room.pk}/read/', 5, method='post', data={'up_to': self.before})
+
+    def test_send_message(self):
+        self.fetch(f'/chat/room/{self.room.pk}/send/', 5, method='post', data={'message': 'Hello'})
+
+    def test_start_chat(self):
+        self.fetch(f'/chat/start/{self.doctor.pk}/', 4, status=302)
+        other = self.data['donors'][50]
+        self.fetch('/chat/start-with-message/', 12, method='post', data={'user_id': other.pk, 'message': 'Hi'})
@@ -3,8 +3,12 @@ from . import views
 
 urlpatterns = [
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('users/search/', views.search_users, name='search_users'),
     path('room/<int:room_id>/', views.room, name='room'),
     path('start/<int:user_id>/', views.start_chat, name='start_chat'),
+    path('room/<int:room_id>/history/', views.room_history, name='room_history'),
+    path('room/<int:room_id>/messages/since/<int:last_id>/', views.messages_since, name='messages_since'),
+    path('room/<int:room_id>/read/', views.mark_read, name='mark_read'),
     path('room/<int:room_id>/send/', views.send_message, name='send_message'),
     path('start-with-message/', views.start_chat_with_message, name='start_chat_with_message'),
 ]
\ No newline at end of file
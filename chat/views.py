@@ -1,3 +1,5 @@
+import asyncio
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
@@ -5,18 +7,58 @@ from django.views.decorators.csrf import csrf_exempt  # For testing; later use p
 from accounts.models import CustomUser
 from .models import ChatRoom, Message
 from django.contrib import messages
+from django.db.models import Q
+from django.db.models.functions import Lower
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from .notify import notifier
+
+# Messages per page of room history
+HISTORY_PAGE_SIZE = 50
+
+# Directory search: fields matched by prefix and the maximum results returned
+USER_SEARCH_FIELDS = ['username', 'first_name', 'last_name', 'city', 'blood_group']
+USER_SEARCH_LIMIT = 20
+
+# Seconds a messages_since request waits for a new message before returning empty
+LONG_POLL_TIMEOUT = 25
+# Seconds a WSGI-served client waits between messages_since polls
+SHORT_POLL_INTERVAL = 3
+
 
 @login_required
 def dashboard(request):
-    # Rooms the current user is in
-    rooms = ChatRoom.objects.filter(participants=request.user).order_by('-created_at')
-    # Other users to start chats with
-    users = CustomUser.objects.exclude(id=request.user.id).order_by('username')
+    # Rooms the current user is in; other users are found via search_users
+    rooms = (ChatRoom.objects.filter(participants=request.user)
+             .with_summary(request.user)
+             .order_by('-created_at'))
     return render(request, 'chat/dashboard.html', {
         'rooms': rooms,
-        'users': users,
     })
 
+
+@login_required
+def search_users(request):
+    query = request.GET.get('q', '').strip().lower()
+    if not query:
+        return JsonResponse({'results': []})
+
+    # Prefix match as a range on the Lower() expression indexes, which (unlike
+    # LIKE 'q%') every backend can answer from the index
+    matches = Q()
+    keys = {}
+    for field in USER_SEARCH_FIELDS:
+        keys[f'{field}_key'] = Lower(field)
+        matches |= Q(**{f'{field}_key__gte': query, f'{field}_key__lt': query + '\uffff'})
+
+    users = (CustomUser.objects.annotate(**keys)
+             .filter(matches, is_active=True)
+             .exclude(id=request.user.id)
+             .order_by('username')
+             .values('id', 'username', 'first_name', 'last_name', 'user_type', 'city', 'blood_group')
+             [:USER_SEARCH_LIMIT])
+    return JsonResponse({'results': list(users)})
+
 @login_required
 def start_chat(request, user_id):
     # Create or reuse a 1:1 room between the current user and another user
@@ -25,14 +67,7 @@ def start_chat(request, user_id):
         messages.error(request, "You can't start a chat with yourself.")
         return redirect('dashboard')
 
-    # Try to find an existing room that contains both users
-    room = (ChatRoom.objects
-            .filter(participants=request.user)
-            .filter(participants=other_user)
-            .first())
-    if not room:
-        room = ChatRoom.objects.create(name=f"Chat_{min(request.user.id, other_user.id)}_{max(request.user.id, other_user.id)}")
-        room.participants.add(request.user, other_user)
+    room, _ = ChatRoom.objects.get_or_create_direct(request.user, other_user)
 
     return redirect('room', room_id=room.id)
 
@@ -49,10 +84,7 @@ def start_chat_with_message(request):
             return JsonResponse({'error': "You cannot chat with yourself."}, status=400)
 
         # Find or create room
-        room = ChatRoom.objects.filter(participants=request.user).filter(participants=other_user).first()
-        if not room:
-            room = ChatRoom.objects.create(name=f"Chat_{request.user.id}_{other_user.id}")
-            room.participants.add(request.user, other_user)
+        room, _ = ChatRoom.objects.get_or_create_direct(request.user, other_user)
 
         # Add initial message if provided
         if initial_message:
@@ -70,12 +102,103 @@ def room(request, room_id):
         messages.error(request, "You don't have access to this chat.")
         return redirect('dashboard')
 
-    messages_qs = Message.objects.filter(room=room).order_by('timestamp')
+    messages_page, has_more = _history_page(room)
+    if messages_page:
+        room.mark_read(request.user, messages_page[-1].id)
     return render(request, 'chat/room.html', {
         'room': room,
-        'messages': messages_qs,
+        'messages': messages_page,
+        'has_more': has_more,
+    })
+
+
+def _history_page(room, before=None):
+    """Return (messages oldest first, has_more) for the page before ``before``."""
+    messages_qs = (Message.objects.filter(room=room)
+                   .select_related('sender')
+                   .order_by('-id'))
+    if before is not None:
+        messages_qs = messages_qs.filter(id__lt=before)
+    page = list(messages_qs[:HISTORY_PAGE_SIZE + 1])
+    has_more = len(page) > HISTORY_PAGE_SIZE
+    return page[:HISTORY_PAGE_SIZE][::-1], has_more
+
+
+@login_required
+def room_history(request, room_id):
+    room = get_object_or_404(ChatRoom, id=room_id)
+
+    if not room.participants.filter(id=request.user.id).exists():
+        return JsonResponse({'error': 'Not allowed'}, status=403)
+
+    before = request.GET.get('before')
+    if before is not None and not before.isdigit():
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+
+    page, has_more = _history_page(room, int(before) if before else None)
+    return JsonResponse({
+        'messages': [msg.to_dict() for msg in page],
+        'has_more': has_more,
     })
 
+def _messages_after(room_id, last_id):
+    return [msg.to_dict() for msg in
+            Message.objects.filter(room_id=room_id, id__gt=last_id)
+            .select_related('sender')
+            .order_by('id')[:HISTORY_PAGE_SIZE]]
+
+
+def _is_participant(room_id, user):
+    return ChatRoom.objects.filter(id=room_id, participants=user).exists()
+
+
+@login_required
+async def messages_since(request, room_id, last_id):
+    user = await request.auser()
+    if not await sync_to_async(_is_participant)(room_id, user):
+        return JsonResponse({'error': 'Not allowed'}, status=403)
+
+    # Under WSGI a waiting request would tie up a worker, so answer at once
+    # and have the client come back later
+    if not isinstance(request, ASGIRequest):
+        new_messages = await sync_to_async(_messages_after)(room_id, last_id)
+        return JsonResponse({
+            'messages': new_messages,
+            'last_id': new_messages[-1]['id'] if new_messages else last_id,
+            'retry_after': SHORT_POLL_INTERVAL,
+        })
+
+    # Listening before the first check means a message committed in between still wakes us
+    with notifier.listen(room_id) as arrived:
+        new_messages = await sync_to_async(_messages_after)(room_id, last_id)
+        if not new_messages:
+            try:
+                await asyncio.wait_for(arrived.wait(), LONG_POLL_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                new_messages = await sync_to_async(_messages_after)(room_id, last_id)
+
+    return JsonResponse({
+        'messages': new_messages,
+        'last_id': new_messages[-1]['id'] if new_messages else last_id,
+    })
+
+@login_required
+def mark_read(request, room_id):
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid method'}, status=405)
+
+    room = get_object_or_404(ChatRoom, id=room_id)
+    if not room.participants.filter(id=request.user.id).exists():
+        return JsonResponse({'error': 'Not allowed'}, status=403)
+
+    up_to = request.POST.get('up_to', '')
+    if not up_to.isdigit():
+        return JsonResponse({'error': 'Invalid message id'}, status=400)
+
+    return JsonResponse({'marked': room.mark_read(request.user, int(up_to))})
+
 # For initial simplicity; later replace csrf_exempt with CSRF token in JS
 @csrf_exempt
 @login_required
@@ -96,7 +219,9 @@ def send_message(request, room_id):
     msg = Message.objects.create(room=room, sender=request.user, content=text)
 
     return JsonResponse({
+        'id': msg.id,
         'sender': request.user.username,
+        'sender_id': request.user.id,
         'text': msg.content,
         'timestamp': msg.timestamp.strftime('%H:%M'),
     })
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""
+In-process load benchmark: drives key pages through the Django test client
+from several threads against the configured database and reports
+throughput and latency percentiles per endpoint.
+
+Run it on a copy of a database filled by ``manage.py generate_data``; it
+only issues GETs, but logging in the benchmark users writes sessions.
+"""
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from bloodapp.models import InformationPost, UserStats
+from chat.models import ChatRoom
+from .metrics import metrics, percentile
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class Endpoint:
+    name: str
+    role: str  # 'anonymous' or the user_type of the user it logs in as
+    path: object  # fixtures -> URL
+
+    def url(self, fixtures):
+        return self.path(fixtures)
+
+
+# URL names double as the view names the metrics middleware records
+ENDPOINTS = [
+    Endpoint('home', 'anonymous', lambda f: reverse('home')),
+    Endpoint('information_center', 'anonymous', lambda f: reverse('information_center')),
+    Endpoint('information_search', 'anonymous', lambda f: reverse('information_center') + '?q=donation'),
+    Endpoint('information_detail', 'anonymous', lambda f: reverse('information_detail', args=[f['post'].pk])),
+    Endpoint('donation_history', 'donor', lambda f: reverse('donation_history')),
+    Endpoint('donor_appointments', 'donor', lambda f: reverse('donor_appointments')),
+    Endpoint('appointment_availability', 'donor', lambda f: reverse('appointment_availability')),
+    Endpoint('recipient_history', 'recipient', lambda f: reverse('recipient_history')),
+    Endpoint('doctor_dashboard', 'doctor', lambda f: reverse('doctor_dashboard')),
+    Endpoint('request_queue', 'doctor', lambda f: reverse('request_queue')),
+    Endpoint('appointment_agenda', 'doctor', lambda f: reverse('appointment_agenda') + '?view=week'),
+    Endpoint('dashboard', 'donor', lambda f: reverse('dashboard')),
+    Endpoint('room', 'donor', lambda f: reverse('room', args=[f['room'].pk])),
+    Endpoint('room_history', 'donor', lambda f: reverse('room_history', args=[f['room'].pk])),
+    Endpoint('profile', 'donor', lambda f: reverse('profile')),
+]
+
+ENDPOINT_NAMES = [endpoint.name for endpoint in ENDPOINTS]
+
+
+class MissingFixture(Exception):
+    pass
+
+
+def find_fixtures():
+    """
+    The busiest user of each type, their busiest chat room and a published
+    post, so every page is measured with realistic amounts of data.
+    """
+    fixtures = {}
+    busiest = {
+        'donor': '-donation_count',
+        'recipient': '-request_count',
+        'doctor': None,
+    }
+    for user_type, order in busiest.items():
+        user = None
+        if order:
+            stats = (UserStats.objects.filter(user__user_type=user_type)
+                     .order_by(order).select_related('user').first())
+            user = stats.user if stats else None
+        user = user or CustomUser.objects.filter(user_type=user_type).order_by('id').first()
+        if user is None:
+            raise MissingFixture(f'No {user_type} users; run generate_data first.')
+        fixtures[user_type] = user
+
+    fixtures['room'] = (ChatRoom.objects.filter(participants=fixtures['donor'])
+                        .annotate(message_count=Count('messages')).order_by('-message_count').first())
+    fixtures['post'] = InformationPost.objects.filter(is_published=True).order_by('-id').first()
+    for name in ('room', 'post'):
+        if fixtures[name] is None:
+            raise MissingFixture(f'No {name} to benchmark; run generate_data first.')
+    return fixtures
+
+
+def default_host():
+    hosts = [host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*']
+    return hosts[0] if hosts else 'localhost'
+
+
+def make_client(user, host):
+    client = Client(HTTP_HOST=host, raise_request_exception=False)
+    if user is not None:
+        client.force_login(user)
+    return client
+
+
+@dataclass
+class Result:
+    endpoint: Endpoint
+    url: str
+    latencies: list = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    elapsed: float = 0.0
+
+    def as_dict(self):
+        latencies = sorted(self.latencies)
+        errors = sum(times for status, times in self.statuses.items() if not 200 <= status < 400)
+        return {
+            'url': self.url,
+            'role': self.endpoint.role,
+            'requests': len(latencies),
+            'errors': errors,
+            'status_codes': {str(status): times for status, times in sorted(self.statuses.items())},
+            'requests_per_second': round(len(latencies) / self.elapsed, 1) if self.elapsed else None,
+            'latency_ms': {
+                'mean': round(sum(latencies) / len(latencies), 2) if latencies else None,
+                **{f'p{pct}': round(percentile(latencies, pct), 2) if latencies else None
+                   for pct in PERCENTILES},
+                'max': round(latencies[-1], 2) if latencies else None,
+            },
+        }
+
+
+def run_endpoint(endpoint, url, clients, requests, warmup=0):
+    """
+    Issue ``requests`` GETs to ``url`` spread over one thread per client,
+    after ``warmup`` untimed requests per client.
+    """
+    result = Result(endpoint, url)
+    lock = threading.Lock()
+    remaining = [requests]
+    start = threading.Barrier(len(clients) + 1)
+
+    def worker(client):
+        try:
+            for _ in range(warmup):
+                client.get(url)
+            start.wait()
+            while True:
+                with lock:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+                began = time.perf_counter()
+                response = client.get(url)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                latency = (time.perf_counter() - began) * 1000
+                with lock:
+                    result.latencies.append(latency)
+                    result.statuses[response.status_code] += 1
+        finally:
+            # Each thread opened its own database connection
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(client,)) for client in clients]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    result.elapsed = time.perf_counter() - began
+    return result
+
+
+def run(names=None, requests=200, concurrency=4, warmup=2, host=None, log=lambda name, entry: None):
+    """Benchmark the named endpoints (default all) and return the report dict."""
+    endpoints = [endpoint for endpoint in ENDPOINTS if names is None or endpoint.name in names]
+    fixtures = find_fixtures()
+    host = host or default_host()
+
+    # Logging in writes sessions, so do it once up front rather than in the threads
+    clients = {}
+    for role in {endpoint.role for endpoint in endpoints}:
+        user = None if role == 'anonymous' else fixtures[role]
+        clients[role] = [make_client(user, host) for _ in range(concurrency)]
+
+    metrics.reset()
+    report = {
+        'started_at': timezone.now().isoformat(),
+        'database': connection.vendor,
+        'requests': requests,
+        'concurrency': concurrency,
+        'endpoints': {},
+    }
+    began = time.perf_counter()
+    for endpoint in endpoints:
+        url = endpoint.url(fixtures)
+        result = run_endpoint(endpoint, url, clients[endpoint.role], requests, warmup)
+        report['endpoints'][endpoint.name] = result.as_dict()
+        log(endpoint.name, report['endpoints'][endpoint.name])
+    report['duration_seconds'] = round(time.perf_counter() - began, 2)
+
+    # Per-request query counts as seen by QueryMetricsMiddleware, when it's installed
+    server = metrics.summary()
+    for name, entry in report['endpoints'].items():
+        if name in server:
+            entry['queries'] = server[name]['queries']
+    connections.close_all()
+    return report
+
+
+def compare(report, baseline):
+    """[(endpoint, rps change %, p95 change %)] against an earlier report."""
+    rows = []
+    for name, entry in report['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(name)
+        if not before:
+            continue
+        rps, old_rps = entry['requests_per_second'], before.get('requests_per_second')
+        p95, old_p95 = entry['latency_ms']['p95'], before.get('latency_ms', {}).get('p95')
+        rows.append((
+            name,
+            round((rps - old_rps) / old_rps * 100, 1) if rps and old_rps else None,
+            round((p95 - old_p95) / old_p95 * 100, 1) if p95 and old_p95 else None,
+        ))
+    return rows
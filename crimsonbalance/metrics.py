@@ -0,0 +1,216 @@
+import logging
+import math
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connection
+
+logger = logging.getLogger('crimsonbalance.metrics')
+
+DEFAULTS = {
+    'ENABLED': True,
+    # Add a Server-Timing header (total, db) to every response
+    'SERVER_TIMING': False,
+    # Samples kept per view for the rolling percentiles
+    'WINDOW': 500,
+    # The same SQL (differing only in parameters) run this often in one
+    # request is reported as a likely N+1
+    'SIMILAR_QUERY_THRESHOLD': 5,
+}
+
+TRANSACTION_STATEMENTS = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+
+def get_setting(name):
+    return getattr(settings, 'PERF_METRICS', {}).get(name, DEFAULTS[name])
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    rank = math.ceil(pct / 100 * len(values))
+    return values[max(rank, 1) - 1]
+
+
+class QueryRecorder:
+    """connection.execute_wrapper() hook counting queries and their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            # Transaction control legitimately repeats (BEGIN, SAVEPOINT ...)
+            if not sql.startswith(TRANSACTION_STATEMENTS):
+                self.statements[(sql, repr(params))] += 1
+
+    def duplicates(self):
+        """SQL run more than once with identical parameters: {sql: times}."""
+        found = Counter()
+        for (sql, _), times in self.statements.items():
+            if times > 1:
+                found[sql] += times
+        return found
+
+    def similar(self, threshold):
+        """SQL run at least ``threshold`` times with any parameters: {sql: times}."""
+        found = Counter()
+        for (sql, _), times in self.statements.items():
+            found[sql] += times
+        return Counter({sql: times for sql, times in found.items() if times >= threshold})
+
+
+# The recorder of the request being handled. Context variables follow the
+# request into sync_to_async threads, where sync views run under ASGI.
+_current_recorder = ContextVar('query_recorder', default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_hook(**kwargs):
+    """
+    Hook _record_query into this thread's connection. Connected to
+    request_started, which is sent from the thread the view's queries run in.
+    """
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+request_started.connect(install_query_hook, dispatch_uid='crimsonbalance.metrics.install_query_hook')
+
+
+class MetricsRegistry:
+    """Rolling per-view samples shared by every request in this process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.samples = defaultdict(lambda: deque(maxlen=get_setting('WINDOW')))
+            self.requests = Counter()
+            self.flagged = Counter()
+            self.flagged_sql = {}
+
+    def record(self, view, wall, queries, db_time, flagged_sql=None):
+        with self.lock:
+            self.samples[view].append((wall, queries, db_time))
+            self.requests[view] += 1
+            if flagged_sql:
+                self.flagged[view] += 1
+                self.flagged_sql[view] = flagged_sql
+
+    def summary(self):
+        with self.lock:
+            samples = {view: list(rows) for view, rows in self.samples.items()}
+            requests, flagged, flagged_sql = Counter(self.requests), Counter(self.flagged), dict(self.flagged_sql)
+
+        report = {}
+        for view, rows in sorted(samples.items()):
+            walls = sorted(row[0] * 1000 for row in rows)
+            queries = sorted(row[1] for row in rows)
+            db_times = sorted(row[2] * 1000 for row in rows)
+            report[view] = {
+                'requests': requests[view],
+                'window': len(rows),
+                'wall_ms': {f'p{pct}': round(percentile(walls, pct), 2) for pct in (50, 95, 99)},
+                'db_ms': {f'p{pct}': round(percentile(db_times, pct), 2) for pct in (50, 95, 99)},
+                'queries': {'p50': percentile(queries, 50), 'p95': percentile(queries, 95), 'max': queries[-1]},
+                'flagged_requests': flagged[view],
+                'last_flagged_sql': flagged_sql.get(view),
+            }
+        return report
+
+
+metrics = MetricsRegistry()
+
+
+class QueryMetricsMiddleware:
+    """
+    Time each request and count the SQL it runs, then file the numbers under
+    the resolved view name in ``metrics``. Requests that repeat a query are
+    logged to ``crimsonbalance.metrics``. Configured by settings.PERF_METRICS.
+
+    Queries run while a StreamingHttpResponse is consumed happen after the
+    view returns and aren't counted.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not get_setting('ENABLED'):
+            return self.get_response(request)
+        with self.measure() as recorder:
+            response = self.get_response(request)
+        return self.finish(request, response, recorder)
+
+    async def __acall__(self, request):
+        if not get_setting('ENABLED'):
+            return await self.get_response(request)
+        with self.measure() as recorder:
+            response = await self.get_response(request)
+        return self.finish(request, response, recorder)
+
+    @contextmanager
+    def measure(self):
+        recorder = QueryRecorder()
+        recorder.start = time.perf_counter()
+        install_query_hook()
+        token = _current_recorder.set(recorder)
+        try:
+            yield recorder
+        finally:
+            _current_recorder.reset(token)
+        recorder.wall = time.perf_counter() - recorder.start
+
+    def finish(self, request, response, recorder):
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+
+        flagged_sql = None
+        duplicates = recorder.duplicates()
+        similar = recorder.similar(get_setting('SIMILAR_QUERY_THRESHOLD'))
+        if duplicates or similar:
+            sql, times = (duplicates or similar).most_common(1)[0]
+            flagged_sql = sql
+            logger.warning(
+                '%s ran %s queries; %s %d times: %s', view, recorder.count,
+                'duplicated' if duplicates else 'repeated', times, sql[:300],
+            )
+
+        metrics.record(view, recorder.wall, recorder.count, recorder.duration, flagged_sql)
+
+        if get_setting('SERVER_TIMING'):
+            response['Server-Timing'] = (
+                f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries", '
+                f'total;dur={recorder.wall * 1000:.1f}'
+            )
+        return response
@@ -49,6 +49,7 @@ CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
 MIDDLEWARE = [
+    'crimsonbalance.metrics.QueryMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -77,6 +78,25 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'crimsonbalance.wsgi.application'
+ASGI_APPLICATION = 'crimsonbalance.asgi.application'
+
+# Chat WebSockets (served by the ASGI application only). The in-memory layer
+# reaches sockets in this process; use chat.layers.RedisChannelLayer with
+# OPTIONS {'url': 'redis://localhost:6379/0'} to fan out across processes.
+CHAT_CHANNEL_LAYER = {
+    'BACKEND': 'chat.layers.InMemoryChannelLayer',
+}
+
+
+# Request metrics (crimsonbalance.metrics): per-view wall time, query count
+# and DB time, summarized for staff at /admin/metrics/. Views that repeat a
+# query are logged to the crimsonbalance.metrics logger.
+PERF_METRICS = {
+    'ENABLED': True,
+    'SERVER_TIMING': DEBUG,
+    'WINDOW': 500,
+    'SIMILAR_QUERY_THRESHOLD': 5,
+}
 
 
 # Database
@@ -90,6 +110,19 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Home page statistics live here; swap the backend for a shared cache when
+# running more than one process.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'crimsonbalance',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -0,0 +1,86 @@
+"""
+Seeding and query-budget helpers shared by the apps' tests.py files.
+
+seed_volume() bulk-creates a realistic population (thousands of donations,
+requests, appointments and messages) so per-URL query budgets catch
+queries that scale with row counts rather than passing on a near-empty
+database.
+"""
+from django.core.cache import cache
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from bloodapp import counters
+from bloodapp.synthetic import Generator
+
+PASSWORD = 'password'
+
+
+def seed_volume(donations=2000, requests=1000, appointments=1500, messages=3000):
+    """
+    Populate the database through the synthetic data generator and return
+    the named fixtures tests log in as or point URLs at.
+    """
+    generator = Generator(prefix='seed', password=PASSWORD)
+    donors = generator.users('donor', 200)
+    recipients = generator.users('recipient', 50)
+    doctor = generator.user('doctor', 'doctor', is_verified=True)
+    donor, recipient = donors[0], recipients[0]
+
+    generator.donations(donors, donations)
+    generator.requests(recipients, requests)
+    generator.appointments(donors, appointments)
+    generator.slots()
+    # Enough stock for the bulk fulfil budgets
+    generator.inventory(units=(500, 1000))
+    posts = generator.posts([doctor], 30)
+
+    per_room = messages // 20
+    rooms = generator.rooms([(donor if i % 2 else doctor, other) for i, other in enumerate(donors[1:21])],
+                            per_room, unread=10)
+    room = generator.room(donor, doctor, per_room, unread=10)
+
+    # bulk_create skipped the signals that maintain UserStats
+    counters.rebuild()
+    return {
+        'donors': donors, 'recipients': recipients, 'doctor': doctor,
+        'donor': donor, 'recipient': recipient, 'posts': posts,
+        'rooms': rooms, 'room': room,
+    }
+
+
+class QueryBudgetMixin:
+    """assertMaxQueries(): like assertNumQueries, but an upper bound."""
+
+    def setUp(self):
+        super().setUp()
+        # Cached home page figures would make counts depend on test order
+        cache.clear()
+
+    def assertMaxQueries(self, limit, using='default'):
+        return _MaxQueriesContext(self, limit, connections[using])
+
+
+class _MaxQueriesContext(CaptureQueriesContext):
+    def __init__(self, test_case, limit, connection):
+        self.test_case = test_case
+        self.limit = limit
+        super().__init__(connection)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return
+        executed = len(self)
+        self.test_case.assertLessEqual(
+            executed, self.limit,
+            f'{executed} queries executed, budget is {self.limit}:\n' +
+            '\n'.join(f'{i}. {query["sql"]}' for i, query in enumerate(self.captured_queries, start=1)),
+        )
+
+
+def consume(response):
+    """Read a (possibly streaming) response body inside the query budget."""
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
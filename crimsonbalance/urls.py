@@ -19,9 +19,12 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib.auth import views as auth_views
+from . import views
 
 
 urlpatterns = [
+    # Must come before the admin's catch-all app_label pattern
+    path('admin/metrics/', views.metrics_summary, name='metrics_summary'),
     path('admin/', admin.site.urls),
     path('', include('bloodapp.urls')),
     path('accounts/', include('accounts.urls')),
@@ -0,0 +1,16 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from .metrics import get_setting, metrics
+
+
+@staff_member_required
+def metrics_summary(request):
+    """Rolling per-view latency and query percentiles; POST clears them."""
+    if request.method == 'POST':
+        metrics.reset()
+    return JsonResponse({
+        'enabled': get_setting('ENABLED'),
+        'window': get_setting('WINDOW'),
+        'views': metrics.summary(),
+    })